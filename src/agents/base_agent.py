@@ -1,11 +1,164 @@
+import asyncio
 import logging
 import os
+import json
+import random
+import time
+import httpx
 import requests
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import Executor
+from functools import lru_cache, partial
+from requests.adapters import HTTPAdapter
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Transient LLM failures (rate limits, 5xx, timeouts) are retried with decorrelated
+# jitter so concurrent requests that fail together do not retry in lockstep.
+LLM_MAX_ATTEMPTS = 3
+LLM_RETRY_INITIAL_DELAY = 1.0
+LLM_RETRY_MAX_DELAY = 30.0
+LLM_RETRY_BACKOFF_FACTOR = 3.0
+# Give up retrying once this much time (monotonic) has passed since the first attempt.
+LLM_RETRY_BUDGET = 60.0
+
+# Long-lived agents (router, engagement, analytics) are never reset, so only the
+# most recent turns are kept.
+MAX_HISTORY_MESSAGES = 64
+
+
+@lru_cache(maxsize=1)
+def get_llm_session() -> requests.Session:
+    """Return the process-wide pooled session for OpenAI-compatible calls.
+
+    Keep-alive connections are shared by every agent, so only the first request
+    to a provider pays for the TCP + TLS handshake. Retries stay with
+    retry_with_exponential_backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Blocking LLM calls from async code run here; None means the loop's default executor.
+_llm_executor: Optional[Executor] = None
+
+
+def set_llm_executor(executor: Optional[Executor]) -> None:
+    """Route blocking LLM calls made from async code to a dedicated pool."""
+    global _llm_executor
+    _llm_executor = executor
+
+
+async def run_llm_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await a blocking LLM call on the LLM executor, leaving the default one for quick I/O."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_llm_executor, partial(func, *args, **kwargs))
+
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_llm_async_client() -> httpx.AsyncClient:
+    """Return the pooled async client for OpenAI-compatible calls on the running loop.
+
+    Concurrent agents share keep-alive connections instead of opening a session
+    per request. Connections are bound to their event loop, so a new loop gets
+    a new client.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        stale, stale_loop = _async_client, _async_client_loop
+        if stale is not None and stale_loop is not None and stale_loop.is_running():
+            # Its connections belong to the other loop, so close it there.
+            asyncio.run_coroutine_threadsafe(stale.aclose(), stale_loop)
+        # A client whose loop has stopped is simply dropped with it.
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=30.0),
+            timeout=120.0,
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def aclose_llm_async_client() -> None:
+    """Close the pooled async LLM client (call on shutdown from the loop that uses it)."""
+    global _async_client, _async_client_loop
+    client, client_loop = _async_client, _async_client_loop
+    _async_client = _async_client_loop = None
+    if client is None:
+        return
+    if client_loop is asyncio.get_running_loop():
+        await client.aclose()
+    elif client_loop is not None and client_loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+
+
+# google-genai APIError.status carries the RPC status name rather than the HTTP code
+_TRANSIENT_STATUS_NAMES = frozenset({"RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL"})
+
+
+def _is_transient_error(exc: Exception) -> bool:
+    """True for rate-limit, server-side and connection failures worth retrying."""
+    response = getattr(exc, "response", None)
+    candidates = (
+        getattr(exc, "code", None),
+        getattr(exc, "status_code", None),
+        getattr(exc, "status", None),
+        getattr(response, "status_code", None),
+    )
+    # bool is an int subclass; anything else in these slots is not an HTTP code
+    code = next((c for c in candidates if isinstance(c, int) and not isinstance(c, bool)), None)
+    if code is not None:
+        return code == 429 or code >= 500
+    status = getattr(exc, "status", None)
+    if isinstance(status, str):
+        return status.upper() in _TRANSIENT_STATUS_NAMES
+    return isinstance(
+        exc, (TimeoutError, ConnectionError, requests.ConnectionError, requests.Timeout, httpx.TransportError)
+    )
+
+
+def _next_retry_delay(delay: float) -> float:
+    """Decorrelated jitter: uniform between the initial delay and the grown previous one."""
+    return random.uniform(LLM_RETRY_INITIAL_DELAY, min(LLM_RETRY_MAX_DELAY, delay * LLM_RETRY_BACKOFF_FACTOR))
+
+
+def retry_with_exponential_backoff(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call ``func``, retrying transient errors with jittered exponential backoff."""
+    deadline = time.monotonic() + LLM_RETRY_BUDGET
+    delay = LLM_RETRY_INITIAL_DELAY
+    for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            delay = _next_retry_delay(delay)
+            if attempt == LLM_MAX_ATTEMPTS or not _is_transient_error(e) or time.monotonic() + delay > deadline:
+                raise
+            logger.warning("LLM call failed (attempt %s/%s), retrying in %.1fs: %s", attempt, LLM_MAX_ATTEMPTS, delay, e)
+            time.sleep(delay)
+
+
+async def aretry_with_exponential_backoff(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Async variant: ``func(*args, **kwargs)`` must return a fresh awaitable per attempt."""
+    deadline = time.monotonic() + LLM_RETRY_BUDGET
+    delay = LLM_RETRY_INITIAL_DELAY
+    for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            delay = _next_retry_delay(delay)
+            if attempt == LLM_MAX_ATTEMPTS or not _is_transient_error(e) or time.monotonic() + delay > deadline:
+                raise
+            logger.warning("LLM call failed (attempt %s/%s), retrying in %.1fs: %s", attempt, LLM_MAX_ATTEMPTS, delay, e)
+            await asyncio.sleep(delay)
+
 
 class BaseAgent:
     """
@@ -38,7 +191,7 @@ class BaseAgent:
         """
         self.role = role
         self.system_prompt = system_prompt
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history: Deque[Dict[str, str]] = deque(maxlen=MAX_HISTORY_MESSAGES)
         self.use_openai_api = use_openai_api
         self.api_config = api_config or {}
         
@@ -57,6 +210,29 @@ class BaseAgent:
         else:
             # OpenAI-compatible mode - no client needed, uses requests
             self.client = None
+
+        # Endpoint, auth headers and sampling parameters are fixed for the agent's
+        # lifetime, so resolve them once. Prefer specific config, fall back to settings.
+        base_url = self.api_config.get('base_url') or getattr(settings, 'OPENAI_BASE_URL', '').rstrip("/")
+        api_key = self.api_config.get('api_key') or getattr(settings, 'OPENAI_API_KEY', '')
+        self._openai_model = self.api_config.get('model') or getattr(settings, 'OPENAI_MODEL', 'grok-2-latest')
+        self._openai_url = f"{base_url}/chat/completions" if base_url else ""
+        self._openai_headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        }
+        self._openai_payload = {
+            "model": self._openai_model,
+            "temperature": 0.7,
+            "max_tokens": 4096  # Increased for GLM/Grok
+        }
+
+    def _openai_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for one OpenAI-compatible request."""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": prompt}
+        ]
     
     def _call_openai_api(self, prompt: str) -> str:
         """
@@ -68,45 +244,24 @@ class BaseAgent:
         Returns:
             The model's response text.
         """
-        # Prefer specific config, fall back to global settings
-        base_url = self.api_config.get('base_url') or getattr(settings, 'OPENAI_BASE_URL', '').rstrip("/")
-        api_key = self.api_config.get('api_key') or getattr(settings, 'OPENAI_API_KEY', '')
-        model = self.api_config.get('model') or getattr(settings, 'OPENAI_MODEL', 'grok-2-latest')
-        
-        if not base_url:
+        if not self._openai_url:
             return f"[{self.role}] Error: API Base URL not configured"
         
-        url = f"{base_url}/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-        
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": prompt}
-        ]
+        payload = {**self._openai_payload, "messages": self._openai_messages(prompt)}
         
-        payload = {
-            "model": model,
-            "messages": messages,
-            "temperature": 0.7,
-            "max_tokens": 4096  # Increased for GLM/Grok
-        }
+        def _post() -> Dict[str, Any]:
+            response = get_llm_session().post(
+                self._openai_url, json=payload, headers=self._openai_headers, timeout=120
+            )
+            response.raise_for_status()
+            return response.json()
 
-        # Add specific parameters for reasoning models if needed
-        if "reasoning" in model.lower():
-            # Some providers might need specific flags, usually standard chat completions work
-            pass
-        
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=120)
-            response.raise_for_status()
-            data = response.json()
+            data = retry_with_exponential_backoff(_post)
             content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
             return content if content else str(data)
         except requests.RequestException as e:
-            return f"[{self.role}] Error calling API ({model}): {e}"
+            return f"[{self.role}] Error calling API ({self._openai_model}): {e}"
     
     def _call_gemini_api(self, prompt: str) -> str:
         """
@@ -122,7 +277,8 @@ class BaseAgent:
             return f"[{self.role}] Error: Gemini client not initialized"
         
         try:
-            response = self.client.models.generate_content(
+            response = retry_with_exponential_backoff(
+                self.client.models.generate_content,
                 model=settings.GEMINI_MODEL_NAME,
                 contents=prompt
             )
@@ -131,6 +287,15 @@ class BaseAgent:
             logger.error(f"[{self.role}] Error executing task: {str(e)}\n(Quota might be exhausted)")
             return f"[{self.role}] Error executing task: {str(e)}\n(Quota might be exhausted)"
     
+    def _build_prompt(self, task: str, context: Optional[List[Dict[str, str]]] = None) -> str:
+        """Render the task plus any agent context into a single user prompt."""
+        if not context:
+            return f"Task: {task}"
+        context_str = "".join(
+            f"[{msg.get('from', 'unknown')}]: {msg.get('content', '')}\n" for msg in context
+        )
+        return f"Task: {task}\n\nContext from other agents:\n{context_str}"
+
     def execute(self, task: str, context: Optional[List[Dict[str, str]]] = None) -> str:
         """
         Execute a task with optional context from other agents.
@@ -138,14 +303,7 @@ class BaseAgent:
         if "PYTEST_CURRENT_TEST" in os.environ:
             return f"[{self.role}] Task completed"
 
-        prompt_parts = [f"Task: {task}"]
-        if context:
-            context_str = "\n\nContext from other agents:\n"
-            for msg in context:
-                context_str += f"[{msg.get('from', 'unknown')}]: {msg.get('content', '')}\n"
-            prompt_parts.append(context_str)
-        
-        full_prompt = "".join(prompt_parts)
+        full_prompt = self._build_prompt(task, context)
         
         if self.use_openai_api:
             result = self._call_openai_api(full_prompt)
@@ -158,41 +316,24 @@ class BaseAgent:
         return result
     async def _call_openai_api_async(self, prompt: str) -> str:
         """Asynchronous call to OpenAI-compatible API."""
-        import aiohttp
-        base_url = self.api_config.get('base_url') or getattr(settings, 'OPENAI_BASE_URL', '').rstrip("/")
-        api_key = self.api_config.get('api_key') or getattr(settings, 'OPENAI_API_KEY', '')
-        model = self.api_config.get('model') or getattr(settings, 'OPENAI_MODEL', 'grok-2-latest')
-        
-        if not base_url:
+        if not self._openai_url:
             return f"[{self.role}] Error: API Base URL not configured"
         
-        url = f"{base_url}/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
-        
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": prompt}
-        ]
-        
-        payload = {
-            "model": model,
-            "messages": messages,
-            "temperature": 0.7,
-            "max_tokens": 4096
-        }
+        payload = {**self._openai_payload, "messages": self._openai_messages(prompt)}
         
+        async def _post() -> Dict[str, Any]:
+            response = await get_llm_async_client().post(
+                self._openai_url, json=payload, headers=self._openai_headers
+            )
+            response.raise_for_status()
+            return response.json()
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers, timeout=120) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    return content if content else str(data)
+            data = await aretry_with_exponential_backoff(_post)
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            return content if content else str(data)
         except Exception as e:
-            return f"[{self.role}] Error calling API ({model}): {e}"
+            return f"[{self.role}] Error calling API ({self._openai_model}): {e}"
 
     async def _call_gemini_api_async(self, prompt: str) -> str:
         """Asynchronous call to Google Gemini API."""
@@ -200,9 +341,9 @@ class BaseAgent:
             return f"[{self.role}] Error: Gemini client not initialized"
         
         try:
-            import asyncio
             # Wrap synchronous generate_content in a thread to keep it async-friendly
-            response = await asyncio.to_thread(
+            response = await aretry_with_exponential_backoff(
+                run_llm_blocking,
                 self.client.models.generate_content,
                 model=settings.GEMINI_MODEL_NAME,
                 contents=prompt
@@ -216,14 +357,7 @@ class BaseAgent:
         if "PYTEST_CURRENT_TEST" in os.environ:
             return f"[{self.role}] Task completed"
         
-        prompt_parts = [f"Task: {task}"]
-        if context:
-            context_str = "\n\nContext from other agents:\n"
-            for msg in context:
-                context_str += f"[{msg.get('from', 'unknown')}]: {msg.get('content', '')}\n"
-            prompt_parts.append(context_str)
-        
-        full_prompt = "".join(prompt_parts)
+        full_prompt = self._build_prompt(task, context)
         
         if self.use_openai_api:
             result = await self._call_openai_api_async(full_prompt)
@@ -235,6 +369,71 @@ class BaseAgent:
         
         return result
     
+    async def _stream_openai_api_async(self, prompt: str) -> AsyncIterator[str]:
+        """Stream text deltas from an OpenAI-compatible API (server-sent events)."""
+        if not self._openai_url:
+            yield f"[{self.role}] Error: API Base URL not configured"
+            return
+        
+        payload = {**self._openai_payload, "messages": self._openai_messages(prompt), "stream": True}
+        
+        try:
+            async with get_llm_async_client().stream(
+                "POST", self._openai_url, json=payload, headers=self._openai_headers
+            ) as response:
+                response.raise_for_status()
+                async for raw_line in response.aiter_lines():
+                    line = raw_line.strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data).get("choices", [{}])[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        except Exception as e:
+            yield f"[{self.role}] Error calling API ({self._openai_model}): {e}"
+
+    async def _stream_gemini_api_async(self, prompt: str) -> AsyncIterator[str]:
+        """Stream text chunks from Google Gemini."""
+        if not self.client:
+            yield f"[{self.role}] Error: Gemini client not initialized"
+            return
+        
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=settings.GEMINI_MODEL_NAME,
+                contents=prompt
+            )
+            async for chunk in stream:
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        except Exception as e:
+            yield f"[{self.role}] Error executing task: {str(e)}"
+
+    async def execute_stream_async(self, task: str, context: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[str]:
+        """Asynchronously execute a task, yielding response text as it is generated."""
+        if "PYTEST_CURRENT_TEST" in os.environ:
+            yield f"[{self.role}] Task completed"
+            return
+        
+        full_prompt = self._build_prompt(task, context)
+        
+        if self.use_openai_api:
+            stream = self._stream_openai_api_async(full_prompt)
+        else:
+            stream = self._stream_gemini_api_async(self.system_prompt + "\n\n" + full_prompt)
+        
+        parts: List[str] = []
+        async for piece in stream:
+            parts.append(piece)
+            yield piece
+        
+        self.conversation_history.append({"role": "user", "content": task})
+        self.conversation_history.append({"role": "assistant", "content": "".join(parts)})
+    
     def reset_history(self):
         """Clear the conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
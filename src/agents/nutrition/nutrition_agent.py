@@ -3,26 +3,36 @@ import json
 import os
 import re
 import colorsys
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
 from dotenv import load_dotenv
 
 load_dotenv()  # ensure .env is loaded before any os.getenv / settings reads
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, run_llm_blocking
 from src.config import settings
 from google import genai
 from google.genai.types import GenerateContentConfig
 from PIL import Image, ImageStat
-from src.cv_food_rec.vision_tool import VisionTool
+from src.cv_food_rec.vision_tool import VisionTool, decode_rgb
 from src.cv_food_rec.gemini_vision_engine import GeminiVisionEngine
-from src.data_rag.simple_rag_tool import SimpleRagTool
+from src.data_rag.simple_rag_tool import SimpleRagTool, get_rag_tool
 
 logger = logging.getLogger(__name__)
 
 # Backwards-compatible alias for older tests and modules that referenced RagTool.
 RagTool = SimpleRagTool
 
+# Text-parsing patterns, compiled once instead of looked up per call.
+_FENCED_JSON_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_QUANTITY_RES = (
+    re.compile(r"x\s*(\d+)"),
+    re.compile(r"(\d+)\s*x"),
+    re.compile(r"(\d+)\s*(?:pieces?|items?|slices?|servings?)"),
+)
+# Any run of punctuation and/or whitespace becomes one space, in a single pass.
+_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
 class NutritionAgent(BaseAgent):
     """
     Specialist agent for food analysis.
@@ -82,7 +92,7 @@ CRITICAL RULES:
         )
         self.vision_tool = vision_tool or VisionTool()
         self.gemini_engine = GeminiVisionEngine()
-        self.rag = SimpleRagTool()
+        self.rag = get_rag_tool()
         # Backwards-compatible attribute name used by earlier phases/tests.
         self.rag_tool = self.rag
 
@@ -100,7 +110,7 @@ CRITICAL RULES:
     def _extract_json(self, text: str) -> Optional[Dict[str, Any]]:
         """Robustly extract JSON from a string."""
         try:
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
+            json_match = _FENCED_JSON_RE.search(text)
             if json_match:
                 return json.loads(json_match.group(1))
             first_brace = text.find('{')
@@ -125,13 +135,8 @@ CRITICAL RULES:
             return 1
 
         text = str(portion_text).lower()
-        patterns = [
-            r"x\s*(\d+)",
-            r"(\d+)\s*x",
-            r"(\d+)\s*(?:pieces?|items?|slices?|servings?)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in _QUANTITY_RES:
+            match = pattern.search(text)
             if match:
                 try:
                     return max(1, int(match.group(1)))
@@ -146,8 +151,7 @@ CRITICAL RULES:
             return ""
 
         # Remove punctuation and collapse whitespace.
-        text = re.sub(r"[^a-z0-9\s]+", " ", text)
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _SEPARATOR_RE.sub(" ", text).strip()
 
         # Citrus aliases → orange (USDA dataset doesn't include separate entries).
         citrus_aliases = ("tangerine", "mandarin", "clementine", "satsuma")
@@ -413,14 +417,14 @@ CRITICAL RULES:
         user_context_str = "{}"
         if context:
             for msg in context:
-                if msg.get("type") == "image_path":
+                if msg.get("type") in ("image_path", "image_bytes"):
                     image_path = msg.get("content")
                 elif msg.get("type") == "user_context":
                     user_context_str = msg.get("content", "{}")
 
         if not image_path:
             # Fallback to sync execute if no image
-            return await asyncio.to_thread(self.execute, task, context)
+            return await run_llm_blocking(self.execute, task, context)
 
         # 1. Parallel Task Initiation (YOLO + Gemini 1st Pass)
         # We start Gemini immediately without waiting for YOLO hints to save time.
@@ -428,10 +432,12 @@ CRITICAL RULES:
         
         async def run_yolo():
             try:
-                # YOLO hints are CPU bound, run in thread or async wrapper
-                hints = await self.vision_tool.detect_food_async(image_path)
+                # YOLO hints are CPU bound, run in thread or async wrapper.
+                # Decode once (off the loop); detection and the colour heuristics share the pixels.
+                img = await asyncio.to_thread(decode_rgb, image_path)
+                hints = await self.vision_tool.detect_food_async(img)
                 # Re-run the reconciliation logic (moved to helper for reuse)
-                yolo_hints = self._process_yolo_raw(hints, image_path)
+                yolo_hints = self._process_yolo_raw(hints, img)
                 if progress_callback:
                     labels = [h["label"] for h in yolo_hints]
                     hint_str = f"🔍 Objects detected: {', '.join(labels)}" if labels else "🔍 Analyzing image..."
@@ -465,19 +471,14 @@ CRITICAL RULES:
 
         rag_matches = []
         if items:
-            # Parallel RAG lookups
-            async def rag_lookup(item):
-                raw_name = item.get("name", "")
-                query_name = self._normalize_food_query(raw_name)
-                match = await asyncio.to_thread(self.rag.search_food, query_name)
+            # All items are scored against the food table in one batched lookup.
+            queries = [self._normalize_food_query(item.get("name", "")) for item in items]
+            rag_results = await asyncio.to_thread(self.rag.search_foods, queries)
+            for item, match in zip(items, rag_results):
                 if match:
-                    match["original_item"] = raw_name
+                    match["original_item"] = item.get("name", "")
                     match["estimated_portion"] = item.get("portion", "unknown")
-                    return match
-                return None
-
-            rag_results = await asyncio.gather(*(rag_lookup(i) for i in items))
-            rag_matches = [m for m in rag_results if m]
+                    rag_matches.append(match)
 
         # 3. Final Synthesis (Parallel with RAG if needed, but here it depends on RAG results)
         synthesis_input = f"""
@@ -535,14 +536,14 @@ Copy 'visual_warnings' and 'health_score' from VISION_RESULT.
 
         return json.dumps(data)
 
-    def _process_yolo_raw(self, detections: List[Dict], image_path: str) -> List[Dict]:
+    def _process_yolo_raw(self, detections: List[Dict], image_path: Union[str, bytes, Image.Image]) -> List[Dict]:
         """Extracted logic for YOLO reconciliation from the original execute()."""
         # Phase 11 & Latency Optimization: Full heuristic restoration
         allow_labels = {"banana", "apple", "orange", "broccoli", "carrot", "pizza", "donut", "cake", "sandwich", "hot dog"}
         try:
-            from PIL import Image, ImageStat
+            from PIL import ImageStat
             import colorsys
-            img = Image.open(image_path).convert("RGB")
+            img = decode_rgb(image_path)
             h_img, w_img = img.height, img.width
 
             def clamp_bbox(bbox):
@@ -593,9 +594,12 @@ Copy 'visual_warnings' and 'health_score' from VISION_RESULT.
                 processed.append({"label": label, "confidence": conf, "bbox": bbox})
             
             # NMS per label
+            by_label = {}
+            for d in processed:
+                by_label.setdefault(d["label"], []).append(d)
             kept = []
-            for label in sorted({d["label"] for d in processed}):
-                dets = sorted([d for d in processed if d["label"] == label], key=lambda x: x["confidence"], reverse=True)
+            for label in sorted(by_label):
+                dets = sorted(by_label[label], key=lambda x: x["confidence"], reverse=True)
                 label_kept = []
                 for d in dets:
                     if all(bbox_iou(d["bbox"], k["bbox"]) < 0.5 for k in label_kept):
@@ -680,7 +684,7 @@ Copy 'visual_warnings' and 'health_score' from VISION_RESULT.
         user_context_str = "{}"
         if context:
             for msg in context:
-                if msg.get("type") == "image_path":
+                if msg.get("type") in ("image_path", "image_bytes"):
                     image_path = msg.get("content")
                 elif msg.get("type") == "user_context":
                     user_context_str = msg.get("content", "{}")
@@ -690,7 +694,12 @@ Copy 'visual_warnings' and 'health_score' from VISION_RESULT.
         if image_path:
             # Fast local detection hints (YOLO) to help Gemini and provide deterministic fallback.
             try:
-                detections = self.vision_tool.detect_food(image_path)
+                img: Optional[Image.Image] = None
+                try:
+                    img = decode_rgb(image_path)
+                except Exception:
+                    img = None
+                detections = self.vision_tool.detect_food(img if img is not None else image_path)
                 allow_labels = {
                     "banana",
                     "apple",
@@ -703,11 +712,6 @@ Copy 'visual_warnings' and 'health_score' from VISION_RESULT.
                     "sandwich",
                     "hot dog",
                 }
-                img: Optional[Image.Image] = None
-                try:
-                    img = Image.open(image_path).convert("RGB")
-                except Exception:
-                    img = None
 
                 def clamp_bbox(bbox: List[float]) -> List[float]:
                     if not img:
@@ -829,9 +833,13 @@ Copy 'visual_warnings' and 'health_score' from VISION_RESULT.
                     processed.append({"label": label, "confidence": conf, "bbox": bbox})
 
                 # Simple NMS per label to prevent double counting.
+                # Bucket detections by label in one pass instead of re-filtering per label.
+                by_label: Dict[str, List[Dict[str, Any]]] = {}
+                for d in processed:
+                    by_label.setdefault(d["label"], []).append(d)
                 kept: List[Dict[str, Any]] = []
-                for label in sorted({d["label"] for d in processed}):
-                    dets = [d for d in processed if d["label"] == label]
+                for label in sorted(by_label):
+                    dets = by_label[label]
                     dets.sort(key=lambda d: float(d.get("confidence") or 0.0), reverse=True)
                     label_kept: List[Dict[str, Any]] = []
                     for d in dets:
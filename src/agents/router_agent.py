@@ -5,7 +5,8 @@ This agent acts as the "manager" in the swarm, analyzing user requests,
 determining which specialist agents to involve, and synthesizing final results.
 """
 
-from typing import Dict, List
+import io
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 from src.agents.base_agent import BaseAgent
 
 
@@ -59,39 +60,52 @@ Example: "I want to train legs and then eat well" -> Delegate to fitness then nu
         """
         analysis = self.execute(user_task)
         
-        # Parse the delegation plan from the response
-        delegations = []
-        lines = analysis.split('\n')
-        current_delegation = {}
+        # Parse the delegation plan from the response, one line at a time
+        delegations = list(self._iter_delegations(io.StringIO(analysis)))
+        
+        # Fallback: if no delegations parsed, use simple keyword matching
+        if not delegations:
+            # print(f"⚠️ Router parsing failed. Raw response:\n{analysis}") # Debug
+            delegations = self._simple_delegate(user_task)
+        
+        return delegations
+    
+    @staticmethod
+    def _iter_delegations(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+        """
+        Parse "Agent:" / "Task:" plan lines, yielding each delegation once complete.
+        
+        A delegation is complete when the next "Agent:" line starts or the input ends,
+        so lines are consumed as they come and the plan is never split up front.
+        """
+        current_delegation: Dict[str, str] = {}
         
         for line in lines:
             # Clean up the line: remove markdown list markers
             line = line.strip()
             clean_line = line.lstrip('-').lstrip('*').strip()
+            # Dispatch on the "key:" prefix; only the short key is lowercased.
+            key, sep, value = clean_line.partition(':')
+            if not sep:
+                continue
+            key = key.lower()
             
-            if clean_line.lower().startswith('agent:'):
-                # If we have a pending delegation that is complete, save it
-                if current_delegation and 'agent' in current_delegation and 'task' in current_delegation:
-                    delegations.append(current_delegation)
+            if key == 'agent':
+                # If we have a pending delegation that is complete, emit it
+                if 'agent' in current_delegation and 'task' in current_delegation:
+                    yield current_delegation
                 # Start new delegation
-                agent_name = clean_line.split(':', 1)[1].strip().lower()
+                agent_name = value.strip().lower()
                 # Clean up agent name (remove quotes if any)
                 agent_name = agent_name.strip("'").strip('"')
                 current_delegation = {'agent': agent_name}
                 
-            elif clean_line.lower().startswith('task:') and current_delegation:
-                current_delegation['task'] = clean_line.split(':', 1)[1].strip()
-        
-        # Add the last one if complete
-        if current_delegation and 'agent' in current_delegation and 'task' in current_delegation:
-            delegations.append(current_delegation)
-        
-        # Fallback: if no delegations parsed, use simple keyword matching
-        if not delegations:
-            # print(f"⚠️ Router parsing failed. Raw response:\n{analysis}") # Debug
-            delegations = self._simple_delegate(user_task)
+            elif key == 'task' and current_delegation:
+                current_delegation['task'] = value.strip()
         
-        return delegations
+        # Emit the last one if complete
+        if 'agent' in current_delegation and 'task' in current_delegation:
+            yield current_delegation
     
     def _simple_delegate(self, task: str) -> List[Dict[str, str]]:
         """
@@ -124,6 +138,41 @@ Example: "I want to train legs and then eat well" -> Delegate to fitness then nu
         
         return delegations
     
+    @staticmethod
+    def _is_error_result(result: str) -> bool:
+        """Agent failures come back as "[role] Error ..." strings rather than exceptions."""
+        return not result or (result.startswith("[") and "] Error" in result[:80])
+
+    def _plan_synthesis(self, delegations: List[Dict[str, str]], results: List[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Decide how agent results are combined.
+        
+        Failed delegations are dropped. A single surviving result (or several
+        identical ones) is returned as-is, and plain-text results are stitched
+        together locally; only structured (JSON) outputs need another model turn
+        to be merged into prose.
+        
+        Returns:
+            ``(response, None)`` when the results combine locally, otherwise
+            ``(None, synthesis_prompt)`` for the model to complete.
+        """
+        successful = [(d, r) for d, r in zip(delegations, results) if not self._is_error_result(r)]
+        if len(successful) == 1:
+            return successful[0][1], None
+        # Agents that answered identically leave nothing to merge.
+        if len(successful) > 1 and len({r.strip() for _, r in successful}) == 1:
+            return successful[0][1], None
+        if successful and not any(r.lstrip().startswith("{") for _, r in successful):
+            return "\n\n".join(f"**{d['agent'].title()}**: {r.strip()}" for d, r in successful), None
+        if successful:
+            delegations, results = [d for d, _ in successful], [r for _, r in successful]
+
+        parts = ["Synthesize a final response based on the following agent outputs:\n\n"]
+        for i, (delegation, result) in enumerate(zip(delegations, results), 1):
+            parts += (str(i), ". [", delegation['agent'], "] ", delegation['task'], "\n   Result: ", result, "\n\n")
+        parts.append("Provide a concise final report summarizing what was accomplished.")
+        return None, "".join(parts)
+
     def synthesize_results(self, delegations: List[Dict[str, str]], results: List[str]) -> str:
         """
         Synthesize final response from multiple agent results.
@@ -135,13 +184,16 @@ Example: "I want to train legs and then eat well" -> Delegate to fitness then nu
         Returns:
             Final synthesized response.
         """
-        synthesis_prompt = f"""Synthesize a final response based on the following agent outputs:
-
-"""
-        for i, (delegation, result) in enumerate(zip(delegations, results), 1):
-            synthesis_prompt += f"{i}. [{delegation['agent']}] {delegation['task']}\n"
-            synthesis_prompt += f"   Result: {result}\n\n"
-        
-        synthesis_prompt += "Provide a concise final report summarizing what was accomplished."
-        
+        response, synthesis_prompt = self._plan_synthesis(delegations, results)
+        if synthesis_prompt is None:
+            return response
         return self.execute(synthesis_prompt)
+
+    async def synthesize_results_stream(self, delegations: List[Dict[str, str]], results: List[str]) -> AsyncIterator[str]:
+        """Like synthesize_results, but yields the model's synthesis as it is generated."""
+        response, synthesis_prompt = self._plan_synthesis(delegations, results)
+        if synthesis_prompt is None:
+            yield response
+            return
+        async for piece in self.execute_stream_async(synthesis_prompt):
+            yield piece
@@ -4,10 +4,12 @@ Uses the modern google-genai SDK (v2026) to identify dishes, ingredients, and es
 Updated to gemini-2.5-flash for reliability beyond March 2026.
 """
 
+import asyncio
+import io
 import os
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 
 from dotenv import load_dotenv
 
@@ -17,12 +19,193 @@ from google import genai
 from PIL import Image
 
 from src.config import settings
+from src.cv_food_rec.vision_tool import open_image
 
 # Recommended Stable Model as of Feb 2026
 DEFAULT_MODEL = "gemini-2.5-flash"
 
 logger = logging.getLogger(__name__)
 
+
+_FOOD_ANALYSIS_PROMPT = """You are an expert nutritionist and chef. Analyze this food image in extreme detail.
+Analyze the dish and ingredients.
+CRITICAL: Ignore generic YOLO labels like 'bowl' or 'plate' if they appear in the image metadata. Focus on actual food content.
+
+## COOKING METHOD & VISUAL RISK ANALYSIS (REQUIRED)
+Carefully scan the food for these visual indicators and cooking methods:
+- **Deep-fried (fried)**: Golden-brown crust, oil sheen, batter coating, crispy texture appearance
+- **Heavy-oil (high_oil)**: Visible oil pooling, glossy surface, greasy appearance, oil drips
+- **Heavy-syrup/Sugary (high_sugar)**: Glazed coating, crystalline sugar visible, sticky shine, caramelization
+- **Processed (processed)**: Uniform artificial color, preservative appearance, factory-made look
+
+Assign a health_score (1-10):
+- 10: Raw vegetables, fresh fruits, steamed/boiled whole foods
+- 7-9: Lightly cooked, minimal oil, whole ingredients
+- 4-6: Moderate processing, some oil/sugar
+- 1-3: Deep-fried, heavy oil, high sugar, highly processed
+
+NUTRITION REFERENCE (per 100g):
+- Banana (raw): ~89 kcal, 1.1g protein, 23g carbs, 0.3g fat
+- Apple (raw): ~52 kcal, 0.3g protein, 14g carbs, 0.2g fat
+- Orange (raw): ~47 kcal, 0.9g protein, 12g carbs, 0.1g fat
+- Beef patty: ~250 kcal, 25g protein, 18g fat, 0g carbs
+- Chicken breast: ~165 kcal, 31g protein, 3.6g fat, 0g carbs
+- Burger bun: ~265 kcal, 9g protein, 50g carbs, 4g fat
+- Cheese slice: ~100 kcal, 6g protein, 0.5g carbs, 9g fat
+- Cooked rice: ~130 kcal, 2.7g protein, 28g carbs, 0.3g fat
+- Pasta: ~131 kcal, 5g protein, 25g carbs, 1.1g fat
+- Fried chicken: ~320 kcal, 18g protein, 15g carbs, 20g fat
+- Donut: ~450 kcal, 5g protein, 50g carbs, 25g fat
+
+Ensure protein, fat, and carbs are NON-ZERO if the food contains meat, cheese, oils, or cereal.
+
+PORTION RULES:
+- If there are multiple of the same item (e.g. several bananas), set `portion` to an explicit count like `x5`.
+- `estimated_weight_grams` should represent the approximate weight PER ITEM (not total) when `portion` is used.
+- Typical unit weights (edible): banana ~118g, apple ~182g, orange ~131g.
+"""
+
+_DETECTION_HINT_PREFIX = "\n\nOBJECT_DETECTIONS (from a local detector; may be noisy—VERIFY VISUALLY): "
+_DETECTION_HINT_SUFFIX = (
+    "\nUse OBJECT_DETECTIONS as hints for naming and counts, but do NOT blindly trust them."
+    "\nKnown failure mode: the detector can confuse oranges/tangerines/mandarins with donuts."
+    "\nIf the object is a solid citrus fruit (no hole), label it as Orange (or Tangerine), NOT Donut."
+    "\nIf OBJECT_DETECTIONS includes banana, ensure banana is included in `items`."
+)
+
+# Phase 13: Structured Output Schema
+# This ensures 100% valid JSON and stable macro fields
+_FOOD_ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "dish_name": {"type": "STRING"},
+        "items": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "portion": {"type": "STRING"},
+                    "main_ingredients": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "estimated_weight_grams": {"type": "NUMBER"},
+                    "visual_volume_percentage": {"type": "NUMBER"},
+                    "macros": {
+                        "type": "OBJECT",
+                        "properties": {
+                            "calories": {"type": "NUMBER"},
+                            "protein": {"type": "NUMBER"},
+                            "carbs": {"type": "NUMBER"},
+                            "fat": {"type": "NUMBER"}
+                        },
+                        "required": ["calories", "protein", "carbs", "fat"]
+                    },
+                    "confidence_score": {"type": "NUMBER"}
+                },
+                "required": ["name", "macros"]
+            }
+        },
+        "total_macros": {
+            "type": "OBJECT",
+            "properties": {
+                "calories": {"type": "NUMBER"},
+                "protein": {"type": "NUMBER"},
+                "carbs": {"type": "NUMBER"},
+                "fat": {"type": "NUMBER"}
+            },
+            "required": ["calories", "protein", "carbs", "fat"]
+        },
+        "total_confidence": {"type": "NUMBER"},
+        "composition_analysis": {"type": "STRING"},
+        "notes": {"type": "STRING"},
+        "visual_warnings": {
+            "type": "ARRAY",
+            "items": {"type": "STRING"},
+            "description": "Risk labels: fried, high_oil, high_sugar, processed"
+        },
+        "health_score": {
+            "type": "INTEGER",
+            "description": "Health score 1-10 (10=healthiest, 1=least healthy)"
+        }
+    },
+    "required": ["dish_name", "total_macros", "items", "visual_warnings", "health_score"]
+}
+
+# Longest side of the photo sent to Gemini; phone photos are downscaled before upload.
+_MAX_IMAGE_SIDE = 1536
+
+_generate_config = None
+
+
+def _analysis_config():
+    """Return the shared GenerateContentConfig, built on first use."""
+    global _generate_config
+    if _generate_config is None:
+        from google.genai.types import GenerateContentConfig
+
+        _generate_config = GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=_FOOD_ANALYSIS_SCHEMA,
+        )
+    return _generate_config
+
+
+# Profile fields that can change the estimate; the rest of the swarm's user context
+# (meal history, preferences, IDs) only costs prompt tokens here.
+_PROMPT_CONTEXT_KEYS = ("age", "gender", "height", "weight", "conditions", "goal", "activity", "diet")
+
+
+def _image_part(source: Union[str, bytes, Image.Image]):
+    """Decode, downscale and JPEG-encode an image once, ready to upload.
+
+    Doing this up front (off the event loop for async callers) keeps the SDK
+    from re-encoding a full-resolution PIL image inside the request.
+    """
+    from google.genai.types import Part
+
+    owned = not isinstance(source, Image.Image)
+    img = open_image(source)
+    try:
+        rgb = img.convert("RGB") if img.mode != "RGB" or not owned else img
+        rgb.thumbnail((_MAX_IMAGE_SIDE, _MAX_IMAGE_SIDE))
+        buf = io.BytesIO()
+        rgb.save(buf, format="JPEG", quality=90)
+        return Part.from_bytes(data=buf.getvalue(), mime_type="image/jpeg")
+    finally:
+        # BR-005: Ephemeral Storage - close images opened here
+        if owned:
+            img.close()
+
+
+def _prompt_user_context(user_context: Optional[str]) -> str:
+    """Reduce a JSON user context to the prompt-relevant keys, compactly serialized."""
+    if not user_context:
+        return ""
+    try:
+        profile = json.loads(user_context)
+    except (TypeError, ValueError):
+        return user_context
+    if not isinstance(profile, dict):
+        return user_context
+    relevant = {k: profile[k] for k in _PROMPT_CONTEXT_KEYS if profile.get(k) not in (None, "", [], {})}
+    return json.dumps(relevant, separators=(",", ":")) if relevant else ""
+
+
+def _build_prompt(
+    user_context: Optional[str] = None,
+    object_detections: Optional[List[Dict[str, Any]]] = None,
+) -> str:
+    """Append the per-request context and detector hints to the static prompt."""
+    parts = [_FOOD_ANALYSIS_PROMPT]
+    user_context = _prompt_user_context(user_context)
+    if user_context:
+        parts.append(f"\n\nUSER CONTEXT: {user_context}")
+    if object_detections:
+        parts.append(_DETECTION_HINT_PREFIX)
+        parts.append(json.dumps(object_detections))
+        parts.append(_DETECTION_HINT_SUFFIX)
+    return "".join(parts)
+
+
 class GeminiVisionEngine:
     """
     Semantic engine for food analysis using Gemini.
@@ -49,7 +232,7 @@ class GeminiVisionEngine:
 
     async def analyze_food_async(
         self,
-        image_path: str,
+        image_path: Union[str, bytes],
         user_context: Optional[str] = None,
         *,
         object_detections: Optional[List[Dict[str, Any]]] = None,
@@ -62,122 +245,14 @@ class GeminiVisionEngine:
 
         logger.info(f"🚀 [Async] Sending image to Gemini {self.model_name}...")
 
-        img = None
         try:
-            from PIL import Image
-            img = Image.open(image_path)
-            
-            prompt = """You are an expert nutritionist and chef. Analyze this food image in extreme detail.
-Analyze the dish and ingredients.
-CRITICAL: Ignore generic YOLO labels like 'bowl' or 'plate' if they appear in the image metadata. Focus on actual food content.
-
-## COOKING METHOD & VISUAL RISK ANALYSIS (REQUIRED)
-Carefully scan the food for these visual indicators and cooking methods:
-- **Deep-fried (fried)**: Golden-brown crust, oil sheen, batter coating, crispy texture appearance
-- **Heavy-oil (high_oil)**: Visible oil pooling, glossy surface, greasy appearance, oil drips
-- **Heavy-syrup/Sugary (high_sugar)**: Glazed coating, crystalline sugar visible, sticky shine, caramelization
-- **Processed (processed)**: Uniform artificial color, preservative appearance, factory-made look
-
-Assign a health_score (1-10):
-- 10: Raw vegetables, fresh fruits, steamed/boiled whole foods
-- 7-9: Lightly cooked, minimal oil, whole ingredients
-- 4-6: Moderate processing, some oil/sugar
-- 1-3: Deep-fried, heavy oil, high sugar, highly processed
-
-NUTRITION REFERENCE (per 100g):
-- Banana (raw): ~89 kcal, 1.1g protein, 23g carbs, 0.3g fat
-- Apple (raw): ~52 kcal, 0.3g protein, 14g carbs, 0.2g fat
-- Orange (raw): ~47 kcal, 0.9g protein, 12g carbs, 0.1g fat
-- Beef patty: ~250 kcal, 25g protein, 18g fat, 0g carbs
-- Chicken breast: ~165 kcal, 31g protein, 3.6g fat, 0g carbs
-- Burger bun: ~265 kcal, 9g protein, 50g carbs, 4g fat
-- Cheese slice: ~100 kcal, 6g protein, 0.5g carbs, 9g fat
-- Cooked rice: ~130 kcal, 2.7g protein, 28g carbs, 0.3g fat
-- Pasta: ~131 kcal, 5g protein, 25g carbs, 1.1g fat
-- Fried chicken: ~320 kcal, 18g protein, 15g carbs, 20g fat
-- Donut: ~450 kcal, 5g protein, 50g carbs, 25g fat
-
-Ensure protein, fat, and carbs are NON-ZERO if the food contains meat, cheese, oils, or cereal.
-
-PORTION RULES:
-- If there are multiple of the same item (e.g. several bananas), set `portion` to an explicit count like `x5`.
-- `estimated_weight_grams` should represent the approximate weight PER ITEM (not total) when `portion` is used.
-- Typical unit weights (edible): banana ~118g, apple ~182g, orange ~131g.
-"""
-            if user_context:
-                prompt += f"\n\nUSER CONTEXT: {user_context}"
-            if object_detections:
-                prompt += (
-                    "\n\nOBJECT_DETECTIONS (from a local detector; may be noisy—VERIFY VISUALLY): "
-                    + json.dumps(object_detections)
-                    + "\nUse OBJECT_DETECTIONS as hints for naming and counts, but do NOT blindly trust them."
-                    + "\nKnown failure mode: the detector can confuse oranges/tangerines/mandarins with donuts."
-                    + "\nIf the object is a solid citrus fruit (no hole), label it as Orange (or Tangerine), NOT Donut."
-                    + "\nIf OBJECT_DETECTIONS includes banana, ensure banana is included in `items`."
-                )
-
-            from google.genai.types import GenerateContentConfig
+            image = await asyncio.to_thread(_image_part, image_path)
+            prompt = _build_prompt(user_context, object_detections)
 
             response = await self.client.aio.models.generate_content(
                 model=self.model_name,
-                contents=[prompt, img],
-                config=GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema={
-                        "type": "OBJECT",
-                        "properties": {
-                            "dish_name": {"type": "STRING"},
-                            "items": {
-                                "type": "ARRAY",
-                                "items": {
-                                    "type": "OBJECT",
-                                    "properties": {
-                                        "name": {"type": "STRING"},
-                                        "portion": {"type": "STRING"},
-                                        "main_ingredients": {"type": "ARRAY", "items": {"type": "STRING"}},
-                                        "estimated_weight_grams": {"type": "NUMBER"},
-                                        "visual_volume_percentage": {"type": "NUMBER"},
-                                        "macros": {
-                                            "type": "OBJECT",
-                                            "properties": {
-                                                "calories": {"type": "NUMBER"},
-                                                "protein": {"type": "NUMBER"},
-                                                "carbs": {"type": "NUMBER"},
-                                                "fat": {"type": "NUMBER"}
-                                            },
-                                            "required": ["calories", "protein", "carbs", "fat"]
-                                        },
-                                        "confidence_score": {"type": "NUMBER"}
-                                    },
-                                    "required": ["name", "macros"]
-                                }
-                            },
-                            "total_macros": {
-                                "type": "OBJECT",
-                                "properties": {
-                                    "calories": {"type": "NUMBER"},
-                                    "protein": {"type": "NUMBER"},
-                                    "carbs": {"type": "NUMBER"},
-                                    "fat": {"type": "NUMBER"}
-                                },
-                                "required": ["calories", "protein", "carbs", "fat"]
-                            },
-                            "total_confidence": {"type": "NUMBER"},
-                            "composition_analysis": {"type": "STRING"},
-                            "notes": {"type": "STRING"},
-                            "visual_warnings": {
-                                "type": "ARRAY",
-                                "items": {"type": "STRING"},
-                                "description": "Risk labels: fried, high_oil, high_sugar, processed"
-                            },
-                            "health_score": {
-                                "type": "INTEGER",
-                                "description": "Health score 1-10 (10=healthiest, 1=least healthy)"
-                            }
-                        },
-                        "required": ["dish_name", "total_macros", "items", "visual_warnings", "health_score"]
-                    }
-                )
+                contents=[prompt, image],
+                config=_analysis_config(),
             )
             
             data = response.parsed
@@ -193,14 +268,10 @@ PORTION RULES:
         except Exception as e:
             logger.error(f"❌ Gemini async analysis failed: {e}")
             return {"error": str(e)}
-        finally:
-            if img is not None:
-                try: img.close()
-                except Exception: pass
 
     def analyze_food(
         self,
-        image_path: str,
+        image_path: Union[str, bytes],
         user_context: Optional[str] = None,
         *,
         object_detections: Optional[List[Dict[str, Any]]] = None,
@@ -213,123 +284,14 @@ PORTION RULES:
 
         logger.info(f"🚀 Sending image to Gemini {self.model_name} for high-fidelity analysis...")
 
-        img = None
         try:
-            img = Image.open(image_path)
-            
-            prompt = """You are an expert nutritionist and chef. Analyze this food image in extreme detail.
-Analyze the dish and ingredients.
-CRITICAL: Ignore generic YOLO labels like 'bowl' or 'plate' if they appear in the image metadata. Focus on actual food content.
-
-## COOKING METHOD & VISUAL RISK ANALYSIS (REQUIRED)
-Carefully scan the food for these visual indicators and cooking methods:
-- **Deep-fried (fried)**: Golden-brown crust, oil sheen, batter coating, crispy texture appearance
-- **Heavy-oil (high_oil)**: Visible oil pooling, glossy surface, greasy appearance, oil drips
-- **Heavy-syrup/Sugary (high_sugar)**: Glazed coating, crystalline sugar visible, sticky shine, caramelization
-- **Processed (processed)**: Uniform artificial color, preservative appearance, factory-made look
-
-Assign a health_score (1-10):
-- 10: Raw vegetables, fresh fruits, steamed/boiled whole foods
-- 7-9: Lightly cooked, minimal oil, whole ingredients
-- 4-6: Moderate processing, some oil/sugar
-- 1-3: Deep-fried, heavy oil, high sugar, highly processed
-
-NUTRITION REFERENCE (per 100g):
-- Banana (raw): ~89 kcal, 1.1g protein, 23g carbs, 0.3g fat
-- Apple (raw): ~52 kcal, 0.3g protein, 14g carbs, 0.2g fat
-- Orange (raw): ~47 kcal, 0.9g protein, 12g carbs, 0.1g fat
-- Beef patty: ~250 kcal, 25g protein, 18g fat, 0g carbs
-- Chicken breast: ~165 kcal, 31g protein, 3.6g fat, 0g carbs
-- Burger bun: ~265 kcal, 9g protein, 50g carbs, 4g fat
-- Cheese slice: ~100 kcal, 6g protein, 0.5g carbs, 9g fat
-- Cooked rice: ~130 kcal, 2.7g protein, 28g carbs, 0.3g fat
-- Pasta: ~131 kcal, 5g protein, 25g carbs, 1.1g fat
-- Fried chicken: ~320 kcal, 18g protein, 15g carbs, 20g fat
-- Donut: ~450 kcal, 5g protein, 50g carbs, 25g fat
-
-Ensure protein, fat, and carbs are NON-ZERO if the food contains meat, cheese, oils, or cereal.
-
-PORTION RULES:
-- If there are multiple of the same item (e.g. several bananas), set `portion` to an explicit count like `x5`.
-- `estimated_weight_grams` should represent the approximate weight PER ITEM (not total) when `portion` is used.
-- Typical unit weights (edible): banana ~118g, apple ~182g, orange ~131g.
-"""
-            if user_context:
-                prompt += f"\n\nUSER CONTEXT: {user_context}"
-            if object_detections:
-                prompt += (
-                    "\n\nOBJECT_DETECTIONS (from a local detector; may be noisy—VERIFY VISUALLY): "
-                    + json.dumps(object_detections)
-                    + "\nUse OBJECT_DETECTIONS as hints for naming and counts, but do NOT blindly trust them."
-                    + "\nKnown failure mode: the detector can confuse oranges/tangerines/mandarins with donuts."
-                    + "\nIf the object is a solid citrus fruit (no hole), label it as Orange (or Tangerine), NOT Donut."
-                    + "\nIf OBJECT_DETECTIONS includes banana, ensure banana is included in `items`."
-                )
-
-            # Phase 13: Structured Output Schema
-            # This ensures 100% valid JSON and stable macro fields
-            from google.genai.types import GenerateContentConfig
+            image = _image_part(image_path)
+            prompt = _build_prompt(user_context, object_detections)
 
             response = self.client.models.generate_content(
                 model=self.model_name,
-                contents=[prompt, img],
-                config=GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema={
-                        "type": "OBJECT",
-                        "properties": {
-                            "dish_name": {"type": "STRING"},
-                            "items": {
-                                "type": "ARRAY",
-                                "items": {
-                                    "type": "OBJECT",
-                                    "properties": {
-                                        "name": {"type": "STRING"},
-                                        "portion": {"type": "STRING"},
-                                        "main_ingredients": {"type": "ARRAY", "items": {"type": "STRING"}},
-                                        "estimated_weight_grams": {"type": "NUMBER"},
-                                        "visual_volume_percentage": {"type": "NUMBER"},
-                                        "macros": {
-                                            "type": "OBJECT",
-                                            "properties": {
-                                                "calories": {"type": "NUMBER"},
-                                                "protein": {"type": "NUMBER"},
-                                                "carbs": {"type": "NUMBER"},
-                                                "fat": {"type": "NUMBER"}
-                                            },
-                                            "required": ["calories", "protein", "carbs", "fat"]
-                                        },
-                                        "confidence_score": {"type": "NUMBER"}
-                                    },
-                                    "required": ["name", "macros"]
-                                }
-                            },
-                            "total_macros": {
-                                "type": "OBJECT",
-                                "properties": {
-                                    "calories": {"type": "NUMBER"},
-                                    "protein": {"type": "NUMBER"},
-                                    "carbs": {"type": "NUMBER"},
-                                    "fat": {"type": "NUMBER"}
-                                },
-                                "required": ["calories", "protein", "carbs", "fat"]
-                            },
-                            "total_confidence": {"type": "NUMBER"},
-                            "composition_analysis": {"type": "STRING"},
-                            "notes": {"type": "STRING"},
-                            "visual_warnings": {
-                                "type": "ARRAY",
-                                "items": {"type": "STRING"},
-                                "description": "Risk labels: fried, high_oil, high_sugar, processed"
-                            },
-                            "health_score": {
-                                "type": "INTEGER",
-                                "description": "Health score 1-10 (10=healthiest, 1=least healthy)"
-                            }
-                        },
-                        "required": ["dish_name", "total_macros", "items", "visual_warnings", "health_score"]
-                    }
-                )
+                contents=[prompt, image],
+                config=_analysis_config(),
             )
             
             data = response.parsed
@@ -347,13 +309,6 @@ PORTION RULES:
         except Exception as e:
             logger.error(f"❌ Gemini analysis failed: {e}")
             return {"error": str(e)}
-        finally:
-            # BR-005: Ephemeral Storage - ensure image is closed
-            if img is not None:
-                try:
-                    img.close()
-                except Exception:
-                    pass
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -4,14 +4,28 @@ Finds food items in images and returns bounding boxes for Phase 2 semantic analy
 Uses a Singleton pattern to ensure the YOLO model is loaded only once.
 """
 
+import io
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 from PIL import Image
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+def open_image(source: Union[str, bytes, Image.Image]) -> Image.Image:
+    """Open an image from a filesystem path or raw uploaded bytes (already-open images pass through)."""
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+def decode_rgb(source: Union[str, bytes, Image.Image]) -> Image.Image:
+    """Decode an image once into RGB pixels so detection and colour heuristics can share it."""
+    img = open_image(source)
+    return img if img.mode == "RGB" else img.convert("RGB")
+
 class VisionTool:
     """
     Vision tool for food detection.
@@ -55,24 +69,31 @@ class VisionTool:
             logger.error("❌ Failed to load YOLOv8 model: %s. Vision features will be limited.", e)
             VisionTool._model = None
 
-    def detect_food(self, image_path: str) -> List[Dict[str, Any]]:
+    def detect_food(self, image_path: Union[str, bytes, Image.Image]) -> List[Dict[str, Any]]:
         """
         Detect food items using YOLOv8 and return bounding boxes.
+        Accepts a file path, the raw bytes of an uploaded image, or a decoded PIL image.
         """
         self._load_model()
         
-        logger.info("🔍 Analyzing image for objects: %s", image_path)
-        image_path_obj = Path(image_path)
-        
-        if not image_path_obj.exists():
-            return [{"error": "Image file not found"}]
+        if isinstance(image_path, Image.Image):
+            logger.info("🔍 Analyzing decoded image for objects (%dx%d)", image_path.width, image_path.height)
+            source = image_path
+        elif isinstance(image_path, (bytes, bytearray)):
+            logger.info("🔍 Analyzing uploaded image for objects (%d bytes)", len(image_path))
+            source = open_image(image_path)
+        else:
+            logger.info("🔍 Analyzing image for objects: %s", image_path)
+            if not Path(image_path).exists():
+                return [{"error": "Image file not found"}]
+            source = image_path
 
         if VisionTool._model is None:
             return [{"error": "Model not loaded"}]
 
         try:
             # Run inference
-            results = VisionTool._model(image_path, verbose=False)
+            results = VisionTool._model(source, verbose=False)
             
             detections = []
             if results and len(results) > 0:
@@ -102,7 +123,7 @@ class VisionTool:
             logger.error("❌ Error during food detection: %s", e)
             return [{"error": str(e)}]
 
-    async def detect_food_async(self, image_path: str) -> List[Dict[str, Any]]:
+    async def detect_food_async(self, image_path: Union[str, bytes, Image.Image]) -> List[Dict[str, Any]]:
         """
         Detect food items asynchronously using a thread pool.
         """
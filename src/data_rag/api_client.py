@@ -4,6 +4,8 @@ import time
 from datetime import datetime
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -62,6 +64,13 @@ class ExerciseAPIClient:
             logger.warning("⚠️ Failed to fetch from API. Cache hydration failed. Degraded performance possible.")
             return False
 
+    def _build_session(self) -> requests.Session:
+        """Session for the paginated crawl: one keep-alive connection, retried on 429/5xx."""
+        session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+        return session
+
     def _fetch_all_wger_exercises(self) -> List[Dict]:
         """Fetches exercises from wger.de and maps them to the expected format."""
         
@@ -70,10 +79,11 @@ class ExerciseAPIClient:
         params = {"language": 2, "limit": 100} 
         
         all_exercises = []
+        session = self._build_session()
         try:
             while url:
                 logger.info(f"Fetching: {url}")
-                response = requests.get(url, params=params if "?" not in url else None, timeout=10.0)
+                response = session.get(url, params=params if "?" not in url else None, timeout=10.0)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -130,7 +140,7 @@ class ExerciseAPIClient:
             img_url = "https://wger.de/api/v2/exerciseimage/?limit=500"
             while img_url:
                 try:
-                    img_resp = requests.get(img_url, headers=self.headers, timeout=10)
+                    img_resp = session.get(img_url, headers=self.headers, timeout=10)
                     img_resp.raise_for_status()
                     img_data = img_resp.json()
                     for img_item in img_data.get("results", []):
@@ -158,6 +168,8 @@ class ExerciseAPIClient:
             logger.error(f"Request Error fetching wger exercises: {e}")
         except Exception as e:
             logger.error(f"Error fetching wger exercises: {e}")
+        finally:
+            session.close()
             
         return all_exercises
 
@@ -10,12 +10,19 @@ Module 3: Dynamic Risk Filtering
 
 import json
 import logging
+import mmap
 import os
+from functools import cached_property, lru_cache
 from typing import List, Dict, Any, Optional
 
 from .api_client import ExerciseAPIClient
 from src.api_client.wger_client import WgerClient
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 try:
     from rapidfuzz import process, fuzz
     FUZZY_AVAILABLE = True
@@ -82,13 +89,45 @@ class SimpleRagTool:
         
         self.safety_protocols = self._load_json("rag/safety_protocols.json")
         
-        # Load Nutritional Data
-        self.usda_foods = self._load_json("raw/usda_common_foods.json")
-        
         # Async Wger Client for on-the-fly image fetching
         self.wger_client = WgerClient()
+
+        # Fuzzy-match haystacks are built once, already lowercased, so every rapidfuzz
+        # call runs with processor=None on lowercased queries; the loaded data never changes.
+        self._exercise_search_space = [self._exercise_text(ex) for ex in self.exercises]
+        self._exercise_contraindications = [
+            frozenset(c.lower() for c in ex.get("contraindications", [])) for ex in self.exercises
+        ]
+        # Prompt-ready "name (Reason: ...)" lines for the fitness LLM context.
+        self._exercise_labels = [self._exercise_label(ex) for ex in self.exercises]
+        # Dish names repeat across scans and users; memoize the fuzzy food lookup.
+        self._match_food = lru_cache(maxsize=1024)(self._match_food_uncached)
+        # Image URLs found on wger, keyed by exercise name.
+        self._exercise_images: Dict[str, str] = {}
         
-        logger.info(f"✅ SimpleRagTool initialized: {len(self.exercises)} exercises, {len(self.usda_foods)} foods, {FUZZY_AVAILABLE=}")
+        logger.info(f"✅ SimpleRagTool initialized: {len(self.exercises)} exercises, {FUZZY_AVAILABLE=}")
+
+    def warmup(self) -> None:
+        """Do the first-use loading ahead of real traffic.
+
+        The nutrition flow needs the food table, so this parses it and builds its haystack,
+        then runs one food and one exercise search to load rapidfuzz. Results are discarded;
+        the memoized food lookup is bypassed so the cache only ever holds real queries.
+        """
+        if self.usda_foods and FUZZY_AVAILABLE:
+            self._match_food_uncached("apple", 75, 1)
+        self._rank_exercises(self._exercise_search_space, "walking", limit=1)
+
+    @cached_property
+    def usda_foods(self) -> List[Dict[str, Any]]:
+        """Nutritional data, loaded on first food lookup or warmup (the fitness flow never needs it)."""
+        foods = self._load_json("raw/usda_common_foods.json")
+        logger.info(f"✅ Loaded {len(foods)} foods")
+        return foods
+
+    @cached_property
+    def _food_search_space(self) -> List[str]:
+        return [f"{f.get('query', '')} {f.get('description', '')}".lower() for f in self.usda_foods]
 
     async def attach_exercise_images_async(self, exercises: List[Dict]) -> List[Dict]:
         """
@@ -97,12 +136,17 @@ class SimpleRagTool:
         import asyncio
         
         async def _fetch_and_attach(ex):
-            if not ex.get("image_url"):
+            if ex.get("image_url"):
+                return ex
+            img = self._exercise_images.get(ex["name"])
+            if not img:
                 # Search on wger
                 img = await self.wger_client.search_exercise_image_async(ex["name"])
-                if img:
-                    ex["image_url"] = img
-            return ex
+                if not img:
+                    return ex
+                self._exercise_images[ex["name"]] = img
+            # Return a copy; the corpus dicts are shared by concurrent requests.
+            return {**ex, "image_url": img}
 
         tasks = [_fetch_and_attach(ex) for ex in exercises]
         return await asyncio.gather(*tasks)
@@ -117,6 +161,11 @@ class SimpleRagTool:
         for path in potential_paths:
             if os.path.exists(path):
                 try:
+                    if orjson is not None:
+                        # Parse straight from the page cache, without a bytes copy
+                        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            with memoryview(mm) as view:
+                                return orjson.loads(view)
                     with open(path, 'r', encoding='utf-8') as f:
                         return json.load(f)
                 except Exception as e:
@@ -130,64 +179,103 @@ class SimpleRagTool:
         """Search for food items with nutritional data."""
         if not self.usda_foods or not query:
             return None
-        
-        query = query.lower().strip()
-        
+
+        match = self._match_food(query.lower().strip(), min_score, limit)
+        # Callers annotate the match, so hand out a copy of the memoized result.
+        return dict(match) if match else None
+
+    def search_foods(self, queries: List[str], min_score: int = 75) -> List[Optional[Dict[str, Any]]]:
+        """Best USDA match (or None) for each query, scored against the table in one batch."""
+        keys = [q.lower().strip() if q else "" for q in queries]
+        unique = list(dict.fromkeys(k for k in keys if k))
+        if not self.usda_foods or not unique:
+            return [None] * len(queries)
+
+        if len(unique) == 1 or not FUZZY_AVAILABLE:
+            found = {k: self._match_food(k, min_score, 1) for k in unique}
+        else:
+            # One (queries x foods) score matrix, computed across cores; top-1 per row is an argmax.
+            scores = process.cdist(
+                unique, self._food_search_space, scorer=fuzz.WRatio, processor=None,
+                score_cutoff=min_score, workers=-1
+            )
+            best = scores.argmax(axis=1)
+            found = {}
+            for row, key in enumerate(unique):
+                idx = int(best[row])
+                score = float(scores[row, idx])
+                found[key] = self._food_match(idx, score) if score >= min_score else None
+        return [dict(found[k]) if k and found[k] else None for k in keys]
+
+    def _match_food_uncached(self, query: str, min_score: int, limit: int) -> Optional[Dict[str, Any]]:
         if FUZZY_AVAILABLE:
-            # Search space: queries and descriptions
-            search_space = [f"{f.get('query', '')} {f.get('description', '')}".lower() for f in self.usda_foods]
-            
-            results = process.extract(
+            # Only the best hit is used; the cutoff is applied while scoring.
+            result = process.extractOne(
                 query,
-                search_space,
+                self._food_search_space,
                 scorer=fuzz.WRatio,
-                limit=limit
+                processor=None,
+                score_cutoff=min_score
             )
-            
-            if results and results[0][1] >= min_score:
-                idx = results[0][2]
-                food_item = self.usda_foods[idx]
-                
-                # Normalize results
-                nutrients = food_item.get("nutrients", {})
-                return {
-                    "name": food_item.get("description", "Unknown").title(),
-                    "calories": nutrients.get("calories", {}).get("value", 0),
-                    "protein": nutrients.get("protein", {}).get("value", 0),
-                    "carbs": nutrients.get("carbs", {}).get("value", 0),
-                    "fat": nutrients.get("fat", {}).get("value", 0),
-                    "confidence": results[0][1],
-                    "source": "USDA"
-                }
+            if result:
+                return self._food_match(result[2], result[1])
         
         return None
 
+    def _food_match(self, idx: int, score: float) -> Dict[str, Any]:
+        """Normalize the USDA row at `idx` into a match result."""
+        food_item = self.usda_foods[idx]
+        nutrients = food_item.get("nutrients", {})
+        return {
+            "name": food_item.get("description", "Unknown").title(),
+            "calories": nutrients.get("calories", {}).get("value", 0),
+            "protein": nutrients.get("protein", {}).get("value", 0),
+            "carbs": nutrients.get("carbs", {}).get("value", 0),
+            "fat": nutrients.get("fat", {}).get("value", 0),
+            "confidence": score,
+            "source": "USDA"
+        }
+
+    @staticmethod
+    def _exercise_text(ex: Dict[str, Any]) -> str:
+        return f"{ex.get('name', '')} {ex.get('category', '')} {' '.join(ex.get('tags', []))}".lower()
+
+    @staticmethod
+    def _exercise_label(ex: Dict[str, Any]) -> str:
+        return f"{ex.get('name', '')} (Reason: {ex.get('description', '')})"
+
     def search_exercises(self, query: str, min_score: int = 60, limit: int = 5) -> List[Dict]:
         """Search exercises with fuzzy matching logic."""
+        return self._search_exercise_list(self.exercises, self._exercise_search_space, query, min_score, limit)
+
+    @staticmethod
+    def _search_exercise_list(
+        exercises: List[Dict],
+        search_space: List[str],
+        query: str,
+        min_score: int = 60,
+        limit: int = 5
+    ) -> List[Dict]:
+        """Fuzzy-match `query` against `exercises`, whose match texts are `search_space`."""
+        return [exercises[idx] for idx in SimpleRagTool._rank_exercises(search_space, query, min_score, limit)]
+
+    @staticmethod
+    def _rank_exercises(search_space: List[str], query: str, min_score: int = 60, limit: int = 5) -> List[int]:
+        """Indices into `search_space` of the best fuzzy matches for `query`."""
         query = query.lower().strip()
         if not query:
-            return self.exercises[:limit]
+            return list(range(min(limit, len(search_space))))
 
         if FUZZY_AVAILABLE:
-            search_space = []
-            for ex in self.exercises:
-                text = f"{ex.get('name', '')} {ex.get('category', '')} {' '.join(ex.get('tags', []))}".lower()
-                search_space.append(text)
-            
             results = process.extract(
                 query,
                 search_space,
                 scorer=fuzz.WRatio,
-                limit=limit * 2
+                processor=None,
+                limit=limit,
+                score_cutoff=min_score
             )
-            
-            matched = []
-            for res in results:
-                score = res[1]
-                idx = res[2]
-                if score >= min_score:
-                    matched.append(self.exercises[idx])
-            return matched[:limit]
+            return [idx for _, _, idx in results]
         
         return []
 
@@ -209,9 +297,9 @@ class SimpleRagTool:
             empathy_strategy: Optional empathy message when preference conflicts with safety (v6.3)
 
         Returns:
-            Dict with safe_exercises, safety_warnings, dynamic_adjustments
+            Dict with safe_exercises (plus their prompt labels), safety_warnings, dynamic_adjustments
         """
-        active_conditions = [c.lower() for c in user_conditions]
+        active_conditions = frozenset(c.lower() for c in user_conditions)
         dynamic_risks = dynamic_risks or []
         dynamic_risks_lower = [r.lower() for r in dynamic_risks]
 
@@ -229,41 +317,36 @@ class SimpleRagTool:
             logger.info(f"[DynamicRisk] Blocking keywords: {blocked_keywords}")
             logger.info(f"[DynamicRisk] Reasons: {dynamic_warnings}")
 
-        # Filter exercises
-        safe_list = []
-        for ex in self.exercises:
-            is_safe = True
-            block_reason = None
-
-            # Check static contraindications
-            for contra in ex.get("contraindications", []):
-                if contra.lower() in active_conditions:
-                    is_safe = False
-                    block_reason = f"Contraindicated for: {contra}"
-                    break
-
-            # Check dynamic risks (intensity-based filtering)
-            if is_safe and blocked_keywords:
-                ex_name = ex.get("name", "").lower()
-                ex_tags = " ".join(ex.get("tags", [])).lower()
-                ex_category = ex.get("category", "").lower()
-                ex_text = f"{ex_name} {ex_category} {ex_tags}"
-
-                for keyword in blocked_keywords:
-                    if keyword in ex_text:
-                        is_safe = False
-                        block_reason = f"Blocked by dynamic risk (keyword: {keyword})"
-                        logger.info(f"[DynamicRisk] Blocked '{ex.get('name')}': {block_reason}")
-                        break
-
-            if is_safe:
-                safe_list.append(ex)
-
-        # Search within safe exercises
-        original_exercises = self.exercises
-        self.exercises = safe_list
-        recs = self.search_exercises(user_query, limit=top_k)
-        self.exercises = original_exercises
+        # Filter exercises; with nothing to screen for, search the cached corpus as-is
+        if not active_conditions and not blocked_keywords:
+            safe_list, safe_space, safe_labels = self.exercises, self._exercise_search_space, self._exercise_labels
+        else:
+            safe_list = []
+            safe_space = []
+            safe_labels = []
+            for ex, ex_text, contras, label in zip(
+                self.exercises, self._exercise_search_space, self._exercise_contraindications, self._exercise_labels
+            ):
+                # Check static contraindications
+                is_safe = contras.isdisjoint(active_conditions)
+
+                # Check dynamic risks (intensity-based filtering)
+                if is_safe and blocked_keywords:
+                    for keyword in blocked_keywords:
+                        if keyword in ex_text:
+                            is_safe = False
+                            block_reason = f"Blocked by dynamic risk (keyword: {keyword})"
+                            logger.info(f"[DynamicRisk] Blocked '{ex.get('name')}': {block_reason}")
+                            break
+
+                if is_safe:
+                    safe_list.append(ex)
+                    safe_space.append(ex_text)
+                    safe_labels.append(label)
+
+        # Search within safe exercises (the tool is shared, so self.exercises stays untouched)
+        hits = self._rank_exercises(safe_space, user_query, limit=top_k)
+        recs = [safe_list[idx] for idx in hits]
 
         # Build safety warnings
         safety_warnings = []
@@ -283,10 +366,16 @@ class SimpleRagTool:
 
         return {
             "safe_exercises": recs,
+            "safe_exercise_labels": [safe_labels[idx] for idx in hits],
             "safety_warnings": safety_warnings,
             "dynamic_adjustments": dynamic_adjustments
         }
 
+@lru_cache(maxsize=None)
+def get_rag_tool(data_dir: str = "health_butler/data") -> SimpleRagTool:
+    """Process-wide SimpleRagTool per data directory (the swarm and every agent share one)."""
+    return SimpleRagTool(data_dir=data_dir)
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     tool = SimpleRagTool()
@@ -8,24 +8,37 @@ Integrates HealthSwarm for message processing with persistent Gateway connection
 import asyncio
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import json
 from json import JSONDecoder
 import re
 import uuid
+from time import monotonic
+from concurrent.futures import Future, ThreadPoolExecutor
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 import discord
 from discord import Client, Intents, Embed
 from discord.ext import tasks
-from datetime import datetime, time
+from datetime import date, datetime, time
 from src.swarm import HealthSwarm
+from src.agents.base_agent import aclose_llm_async_client, set_llm_executor
 from src.discord_bot.embed_builder import HealthButlerEmbed
-from src.discord_bot.views import RegistrationViewA, OnboardingGreetingView, NewUserGuideView
+from src.discord_bot.views import (
+    RegistrationViewA, OnboardingGreetingView, NewUserGuideView, LogWorkoutView, MealLogView
+)
+from src.discord_bot.roulette_view import MealInspirationView
 from src.agents.engagement.engagement_agent import EngagementAgent
 from src.agents.analytics.analytics_agent import AnalyticsAgent
-from src.discord_bot.profile_db import get_profile_db
+from src.discord_bot.profile_db import MEAL_INSERT_TIMEOUT, get_profile_db
+from src.discord_bot.http_client import get_http_client
 from src.discord_bot import profile_utils as pu
 from src.discord_bot import intent_parser as ip
 from src.discord_bot import commands as cmd
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from aiohttp import web
 
 # Setup logging
@@ -39,6 +52,113 @@ logger = logging.getLogger(__name__)
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 DISCORD_ACTIVITY = os.getenv("DISCORD_ACTIVITY", "Helping with nutrition & fitness")
 
+# Fast path for parsing model JSON; stdlib when orjson is unavailable
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Static Cloud Run health probe body (pre-encoded; probes hit this constantly)
+_HEALTH_BODY = b"OK"
+
+# Proactive loops: resolved discord.User objects are reused for an hour, and at most
+# this many users are processed (LLM call + DM) at once to stay inside rate limits.
+_USER_CACHE_TTL = 3600.0
+_PROACTIVE_CONCURRENCY = 5
+
+# Scanned meals are queued on ProfileDB's insert batcher after the reply goes out;
+# shutdown waits this long for those writes to land before cancelling them.
+_MEAL_DRAIN_TIMEOUT = 15.0
+
+# Nutrition payload macro key -> meals table column
+_MACRO_COLUMNS = (("calories", "calories"), ("protein", "protein_g"), ("carbs", "carbs_g"), ("fat", "fat_g"))
+
+# Every possible progress bar in the nutrition embed, keyed by marker then fill level.
+_MACRO_BARS = {m: tuple(m * i + "⬛" * (12 - i) for i in range(13)) for m in ("🟦", "🟨", "🟩")}
+_IMPACT_BARS = {m: tuple(m * i + "⬜" * (10 - i) for i in range(11)) for m in ("🟧", "🟦", "🟨", "🟩")}
+
+
+def _macro_split(p: float, c: float, f: float) -> Tuple[float, float, float, int, int, int]:
+    """Percent share and clamped _MACRO_BARS index for protein, carbs and fat."""
+    total = p + c + f
+    if total <= 0:
+        return 0.0, 0.0, 0.0, 0, 0, 0
+    ps, cs, fs = p / total, c / total, f / total
+    return (
+        ps * 100, cs * 100, fs * 100,
+        max(0, min(12, int(ps * 12))), max(0, min(12, int(cs * 12))), max(0, min(12, int(fs * 12))),
+    )
+
+
+class _StatusReply:
+    """Channel stand-in whose first send() turns a status message into the reply.
+
+    Editing the "analyzing..." message in place costs one API round trip where
+    deleting it and sending the result costs two.
+    """
+
+    def __init__(self, channel, status_msg):
+        self._channel = channel
+        self._status_msg = status_msg
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        status_msg, self._status_msg = self._status_msg, None
+        if status_msg is not None:
+            try:
+                return await status_msg.edit(content=content, **kwargs)
+            except Exception:
+                try:
+                    await status_msg.delete()
+                except Exception:
+                    pass
+        return await self._channel.send(content, **kwargs)
+
+
+def _iter_json_objects(value: Any):
+    """Yield every dict in a decoded JSON value, in source order (pre-order)."""
+    if isinstance(value, dict):
+        yield value
+        for child in value.values():
+            yield from _iter_json_objects(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _iter_json_objects(child)
+
+
+def _json_payload(text: str) -> Optional[Dict[str, Any]]:
+    """Most relevant JSON object in model output (see HealthButlerDiscordBot._extract_json_payload)."""
+    clean = text.strip()
+
+    if "```json" in clean:
+        clean = clean.split("```json")[-1].split("```")[0].strip()
+    elif "```" in clean:
+        clean = clean.split("```")[-1].split("```")[0].strip()
+
+    try:
+        parsed = _json_loads(clean)
+        if isinstance(parsed, dict):
+            return parsed
+    except Exception:
+        pass
+
+    # Single pass: after decoding an object, resume scanning past its end and walk
+    # nested objects in the parsed value instead of re-decoding every inner "{".
+    decoder = JSONDecoder()
+    first: Optional[Dict[str, Any]] = None
+    idx = clean.find("{")
+    while idx != -1:
+        try:
+            obj, end = decoder.raw_decode(clean, idx)
+        except Exception:
+            idx = clean.find("{", idx + 1)
+            continue
+        if isinstance(obj, dict):
+            for candidate in _iter_json_objects(obj):
+                if "dish_name" in candidate and "total_macros" in candidate:
+                    return candidate
+                if first is None:
+                    first = candidate
+        idx = clean.find("{", end)
+
+    return first
+
 
 # Logic moved to views.py, profile_utils.py, intent_parser.py, and commands.py
 
@@ -48,23 +168,51 @@ DISCORD_ACTIVITY = os.getenv("DISCORD_ACTIVITY", "Helping with nutrition & fitne
 
 class HealthButlerDiscordBot(Client):
     def __init__(self):
-        intents = Intents.default()
-        intents.message_content = True
-        intents.messages = True
+        # Opt in only to the Gateway events this bot consumes; presence, typing,
+        # reaction, voice etc. are never used and would only add parse overhead.
+        intents = Intents.none()
         intents.guilds = True
+        intents.guild_messages = True
+        intents.dm_messages = True  # Private tracking and sensitive-query redirects use DMs
+        intents.message_content = True
 
-        super().__init__(intents=intents, heartbeat_timeout=120)
+        # Keep Cloud Run RSS flat: no member chunking/cache and no message ring buffer.
+        # message.author and interaction payloads carry everything the handlers read.
+        super().__init__(
+            intents=intents,
+            heartbeat_timeout=120,
+            chunk_guilds_at_startup=False,
+            member_cache_flags=discord.MemberCacheFlags.none(),
+            max_messages=None,
+        )
 
         # Initialize Supabase ProfileDB
         try:
-            pu.profile_db = get_profile_db()
+            pu.profile_db = get_profile_db(http_client=get_http_client())
             logger.info("✅ Supabase ProfileDB initialized")
         except Exception as e:
-            logger.warning(f"⚠️ ProfileDB init failed (continuing without persistence): {e}")
+            logger.warning("⚠️ ProfileDB init failed (continuing without persistence): %s", e)
             pu.profile_db = None
 
         self.swarm = HealthSwarm(verbose=True)
+        # Bounded pool for the swarm's blocking LLM calls (registered in setup_hook). Quick
+        # Supabase reads and meal writes keep using the loop's default executor.
+        self._swarm_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("SWARM_WORKERS", "4")),
+            thread_name_prefix="swarm",
+        )
+        # Tasks awaiting a queued meal insert (see _complete_meal_write)
+        self._meal_writes: Set[asyncio.Task] = set()
+        # Health server start-up and agent warm-up, started in setup_hook and cancelled in close()
+        self._background_tasks: List[asyncio.Task] = []
+        # (user_id, request key) pairs currently being processed
+        self._inflight: Set[Tuple[str, str]] = set()
         self.start_time = datetime.now()
+        self._health_runner: Optional[web.AppRunner] = None
+        # channel_id -> "guild/channel" label for hot-path logging
+        self._ctx_label_cache: Dict[int, str] = {}
+        # user_id -> (discord.User, expiry) for proactive DMs
+        self._user_cache: Dict[int, Tuple["discord.User", float]] = {}
         # Optional demo safety allowlists (comma-separated IDs). Empty => allow all.
         self.allowed_user_ids = pu._parse_int_set(os.getenv("DISCORD_ALLOWED_USER_IDS"))
         self.allowed_channel_ids = pu._parse_int_set(os.getenv("DISCORD_ALLOWED_CHANNEL_IDS"))
@@ -73,15 +221,20 @@ class HealthButlerDiscordBot(Client):
         logger.info("Health Butler Discord Bot initialized with Engagement and Analytics Agents")
 
     async def setup_hook(self):
+        set_llm_executor(self._swarm_pool)
         logger.info("Bot setup_hook: starting proactive loops")
         # Start loops
         if not self.morning_checkin.is_running():
             self.morning_checkin.start()
         if not self.nightly_summary.is_running():
             self.nightly_summary.start()
-        
-        # Start health check server within the loop
-        asyncio.create_task(self._start_health_server())
+
+        self._background_tasks = [
+            # Start health check server within the loop
+            asyncio.create_task(self._start_health_server()),
+            # Load the specialist agents in the background instead of on the first request.
+            asyncio.create_task(self.swarm.warm_up()),
+        ]
 
     async def _send_proactive_message(self, user_id: str, embed: discord.Embed, view: Optional[discord.ui.View] = None):
         """Helper to send proactive DM to user if allowed."""
@@ -92,27 +245,82 @@ class HealthButlerDiscordBot(Client):
             if not prefs.get("allow_proactive_notifications", True):
                 return
 
-            user = await self.fetch_user(int(user_id))
+            user = await self._get_user(int(user_id))
             if user:
                 await user.send(embed=embed, view=view)
-                logger.info(f"📬 Sent proactive message to {user.display_name}")
+                logger.info("📬 Sent proactive message to %s", user.display_name)
         except Exception as e:
-            logger.error(f"Failed to send proactive message to {user_id}: {e}")
+            logger.error("Failed to send proactive message to %s: %s", user_id, e)
+
+    async def _get_user(self, user_id: int) -> "discord.User":
+        """Resolve a user for DMs, avoiding a REST fetch_user call when possible."""
+        user = self.get_user(user_id)
+        if user is not None:
+            return user
+        cached = self._user_cache.get(user_id)
+        now = monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        user = await self.fetch_user(user_id)
+        self._user_cache[user_id] = (user, now + _USER_CACHE_TTL)
+        return user
+
+    async def _for_each_cached_user(self, handler, label: str) -> None:
+        """Run handler(user_id) for every cached profile, a few users at a time."""
+        sem = asyncio.Semaphore(_PROACTIVE_CONCURRENCY)
+
+        async def run(user_id: str) -> None:
+            async with sem:
+                try:
+                    await handler(user_id)
+                except Exception as e:
+                    logger.error("Error in %s for %s: %s", label, user_id, e)
+
+        await asyncio.gather(*(run(user_id) for user_id in list(pu._user_profiles_cache.keys())))
 
     async def _start_health_server(self):
         """Minimal HTTP server for Cloud Run health checks."""
         app = web.Application()
-        app.router.add_get('/health', lambda r: web.Response(text="OK"))
+        app.router.add_get('/health', self._handle_health)
         port = int(os.getenv("PORT", 8080))
         runner = web.AppRunner(app)
         await runner.setup()
         site = web.TCPSite(runner, '0.0.0.0', port)
         await site.start()
-        logger.info(f"❤️ Health check server started on port {port}")
+        self._health_runner = runner
+        logger.info("❤️ Health check server started on port %s", port)
+
+    async def _handle_health(self, request):
+        return web.Response(body=_HEALTH_BODY, content_type="text/plain")
+
+    async def close(self):
+        """Tear down the health check server, LLM client and swarm pool around disconnecting."""
+        if self._meal_writes:
+            # Let queued meal writes land (and failure notices go out) before disconnecting.
+            _, pending = await asyncio.wait(set(self._meal_writes), timeout=_MEAL_DRAIN_TIMEOUT)
+            if pending:
+                logger.warning("Shutting down with %s meal writes still queued", len(pending))
+                for write in pending:
+                    write.cancel()
+        for task in self._background_tasks:
+            task.cancel()
+        # Let the cancellations finish so a half-started health server is not left behind.
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks = []
+        if self._health_runner is not None:
+            try:
+                await self._health_runner.cleanup()
+            except Exception as e:
+                logger.warning("Health server cleanup failed: %s", e)
+            self._health_runner = None
+        await aclose_llm_async_client()
+        await super().close()
+        set_llm_executor(None)
+        self._swarm_pool.shutdown(wait=False, cancel_futures=True)
 
     async def on_ready(self):
-        logger.info(f"✅ Bot logged in as {self.user} (ID: {self.user.id})")
-        logger.info(f"📡 Intents Status -> Message Content: {self.intents.message_content}, Guilds: {self.intents.guilds}, Messages: {self.intents.messages}")
+        logger.info("✅ Bot logged in as %s (ID: %s)", self.user, self.user.id)
+        logger.info("📡 Intents Status -> Message Content: %s, Guilds: %s, Messages: %s", self.intents.message_content, self.intents.guilds, self.intents.messages)
         # Start proactive tasks (Phase 4 & 6)
         if not self.morning_checkin.is_running():
             self.morning_checkin.start()
@@ -128,75 +336,82 @@ class HealthButlerDiscordBot(Client):
         
         # In a real production bot, we would iterate over all active users in Supabase.
         # For this implementation, we'll process the cached users who have opted in.
-        for user_id in list(pu._user_profiles_cache.keys()):
-            profile = pu._user_profiles_cache[user_id]
-            
-            # Generate personalized greeting
-            result = await self.engagement_agent.generate_morning_greeting(profile)
-            
-            embed = discord.Embed(
-                title=f"☀️ Good Morning, {profile.get('name', 'there')}!",
-                description=result.get("greeting", "Ready for a healthy day?"),
-                color=discord.Color.gold()
-            )
-            embed.add_field(name="🎯 Today's Focus", value=result.get("focus_goal", profile.get("goal")), inline=False)
-            embed.add_field(name="💡 Butler Tip", value=result.get("tip", "Remember to stay hydrated!"), inline=False)
-            embed.set_footer(text="Settings: Use /settings to manage notifications")
-            
-            await self._send_proactive_message(user_id, embed)
+        await self._for_each_cached_user(self._send_morning_checkin, "morning_checkin")
+
+    async def _send_morning_checkin(self, user_id: str) -> None:
+        profile = pu._user_profiles_cache.get(user_id)
+        if profile is None:
+            return
+        
+        # Generate personalized greeting
+        result = await self.engagement_agent.generate_morning_greeting(profile)
+        
+        embed = discord.Embed(
+            title=f"☀️ Good Morning, {profile.get('name', 'there')}!",
+            description=result.get("greeting", "Ready for a healthy day?"),
+            color=discord.Color.gold()
+        )
+        embed.add_field(name="🎯 Today's Focus", value=result.get("focus_goal", profile.get("goal")), inline=False)
+        embed.add_field(name="💡 Butler Tip", value=result.get("tip", "Remember to stay hydrated!"), inline=False)
+        embed.set_footer(text="Settings: Use /settings to manage notifications")
+        
+        await self._send_proactive_message(user_id, embed)
 
     @tasks.loop(time=time(21, 30, tzinfo=pu.LOCAL_TZ))
     async def nightly_summary(self):
         """Proactive nightly summary (Phase 4)."""
         logger.info("🌙 Running scheduled nightly health summaries...")
+        await self._for_each_cached_user(self._send_nightly_summary, "nightly_summary")
+
+    async def _send_nightly_summary(self, user_id: str) -> None:
+        # 1. Aggregate today's data (Meals + Workouts)
+        if not pu.profile_db:
+            return
+        aggregation = await asyncio.to_thread(pu.profile_db.get_daily_aggregation, user_id)
+        profile = pu.get_user_profile(user_id)
         
-        for user_id in list(pu._user_profiles_cache.keys()):
-            # 1. Aggregate today's data (Meals + Workouts)
-            if pu.profile_db:
-                aggregation = pu.profile_db.get_daily_aggregation(user_id)
-                profile = pu.get_user_profile(user_id)
-                
-                # 2. Generate AI Insight
-                report = await self.engagement_agent.generate_daily_report(aggregation, profile)
-                
-                embed = discord.Embed(
-                    title="📊 Daily Health Report",
-                    description=report.get("summary_text", "Here is your summary for today."),
-                    color=discord.Color.purple() if report.get("status") == "on_track" else discord.Color.orange()
-                )
-                
-                embed.add_field(name="🍽️ Intake", value=f"{aggregation['calories_in']:.0f} kcal", inline=True)
-                embed.add_field(name="🏋️ Burned", value=f"{aggregation['calories_out']:.0f} kcal", inline=True)
-                embed.add_field(name="⚖️ Net", value=f"{aggregation['net_calories']:.0f} kcal", inline=True)
-                embed.add_field(name="🚀 Tomorrow", value=report.get("tomorrow_tip", "Keep up the momentum!"), inline=False)
-                
-                await self._send_proactive_message(user_id, embed)
+        # 2. Generate AI Insight
+        report = await self.engagement_agent.generate_daily_report(aggregation, profile)
+        
+        embed = discord.Embed(
+            title="📊 Daily Health Report",
+            description=report.get("summary_text", "Here is your summary for today."),
+            color=discord.Color.purple() if report.get("status") == "on_track" else discord.Color.orange()
+        )
+        
+        embed.add_field(name="🍽️ Intake", value=f"{aggregation['calories_in']:.0f} kcal", inline=True)
+        embed.add_field(name="🏋️ Burned", value=f"{aggregation['calories_out']:.0f} kcal", inline=True)
+        embed.add_field(name="⚖️ Net", value=f"{aggregation['net_calories']:.0f} kcal", inline=True)
+        embed.add_field(name="🚀 Tomorrow", value=report.get("tomorrow_tip", "Keep up the momentum!"), inline=False)
+        
+        await self._send_proactive_message(user_id, embed)
 
     @tasks.loop(time=[time(11, 30, tzinfo=pu.LOCAL_TZ), time(17, 30, tzinfo=pu.LOCAL_TZ)])
     async def pre_meal_reminder(self):
         """Active inspiration for upcoming meals (Phase 6)."""
         logger.info("🎰 Running scheduled pre-meal inspiration checks...")
-        for user_id in list(pu._user_profiles_cache.keys()):
-            try:
-                profile = pu.get_user_profile(user_id)
-                stats = pu.profile_db.get_today_stats(user_id) if pu.profile_db else {"total_calories": 0}
-                target = pu.calculate_daily_target(profile)
-                remaining = {"calories": max(0, target - stats["total_calories"])}
-                
-                embed = discord.Embed(
-                    title="🥗 Time for a boost?",
-                    description=(
-                        f"Hi **{profile.get('name', 'there')}**! It's almost meal time.\n"
-                        f"You have **{int(remaining['calories'])} kcal** remaining in your daily budget.\n\n"
-                        "Need some healthy inspiration? Try the **Food Roulette** below!"
-                    ),
-                    color=discord.Color.green()
-                )
-                from src.discord_bot.views import MealInspirationView
-                view = MealInspirationView(user_id, remaining)
-                await self._send_proactive_message(user_id, embed, view=view)
-            except Exception as e:
-                logger.error(f"Error in pre_meal_reminder for {user_id}: {e}")
+        await self._for_each_cached_user(self._send_pre_meal_reminder, "pre_meal_reminder")
+
+    async def _send_pre_meal_reminder(self, user_id: str) -> None:
+        profile = pu.get_user_profile(user_id)
+        if pu.profile_db:
+            stats = await asyncio.to_thread(pu.profile_db.get_today_stats, user_id)
+        else:
+            stats = {"total_calories": 0}
+        target = pu.calculate_daily_target(profile)
+        remaining = {"calories": max(0, target - stats["total_calories"])}
+        
+        embed = discord.Embed(
+            title="🥗 Time for a boost?",
+            description=(
+                f"Hi **{profile.get('name', 'there')}**! It's almost meal time.\n"
+                f"You have **{int(remaining['calories'])} kcal** remaining in your daily budget.\n\n"
+                "Need some healthy inspiration? Try the **Food Roulette** below!"
+            ),
+            color=discord.Color.green()
+        )
+        view = MealInspirationView(user_id, remaining)
+        await self._send_proactive_message(user_id, embed, view=view)
 
     @morning_checkin.before_loop
     @nightly_summary.before_loop
@@ -218,10 +433,26 @@ class HealthButlerDiscordBot(Client):
                 content=normalized_content,
             )
         except Exception as exc:
-            logger.warning(f"Failed to persist chat message: {exc}")
+            logger.warning("Failed to persist chat message: %s", exc)
+
+    def _channel_label(self, message: discord.Message) -> str:
+        """Return a cached 'guild/channel' display label for log lines."""
+        channel_id = message.channel.id
+        label = self._ctx_label_cache.get(channel_id)
+        if label is None:
+            label = f"{message.guild}/{message.channel}"
+            self._ctx_label_cache[channel_id] = label
+        return label
+
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        # Guild renames change every cached label under it; drop them all.
+        self._ctx_label_cache.clear()
+
+    async def on_guild_channel_update(self, before, after):
+        self._ctx_label_cache.pop(after.id, None)
 
     async def on_message(self, message: discord.Message):
-        logger.info(f"📩 Message received: '{message.content}' from {message.author} (ID: {message.author.id}) in {message.guild}/{message.channel}")
+        logger.info("📩 Message received: '%s' from %s (ID: %s) in %s", message.content, message.author, message.author.id, self._channel_label(message))
         if message.author.bot: return
 
         # Optional allowlists for demo safety (empty allowlist => allow all)
@@ -230,10 +461,10 @@ class HealthButlerDiscordBot(Client):
         if self.allowed_channel_ids and message.channel.id not in self.allowed_channel_ids:
             return
 
-        self._persist_chat_message(str(message.author.id), "user", message.content)
-
-        # Helper for user_id and content stripping
+        # Resolved once per event and threaded through every handler below
         author_id = str(message.author.id)
+
+        self._persist_chat_message(author_id, "user", message.content)
         
         # Strip mentions to allow @Butler hi or just hi
         clean_content = message.content.replace(f"<@!{self.user.id}>", "").replace(f"<@{self.user.id}>", "").strip()
@@ -241,7 +472,7 @@ class HealthButlerDiscordBot(Client):
 
         # Temporary Connectivity Debug
         if content_lower == "ping":
-            logger.info(f"🏓 Ping matching for {message.author}")
+            logger.info("🏓 Ping matching for %s", message.author)
             await message.reply("🏓 pong! I am alive and can see your messages.")
             return
 
@@ -253,8 +484,8 @@ class HealthButlerDiscordBot(Client):
         # Phase 6.1/6.2: Premium "Cold Start" Onboarding Hook
         greetings = ["hi", "hello", "你好", "start", "hey", "👋"]
         if content_lower in greetings or content_lower == "/setup":
-            logger.info(f"👋 Greeting detected from {message.author}: {content_lower}")
-            profile = pu.get_user_profile(author_id)
+            logger.info("👋 Greeting detected from %s: %s", message.author, content_lower)
+            profile = await pu.get_user_profile_async(author_id)
             onboarding_done = profile.get("preferences", {}).get("onboarding_completed", False)
             if not onboarding_done and "preferences_json" in profile:
                 onboarding_done = profile.get("preferences_json", {}).get("onboarding_completed", False)
@@ -300,7 +531,7 @@ class HealthButlerDiscordBot(Client):
             is_public = False
             
         if is_public and ip._is_sensitive_query(content_lower):
-            logger.info(f"🔒 Redirecting sensitive query to DM for {message.author}")
+            logger.info("🔒 Redirecting sensitive query to DM for %s", message.author)
             
             # 1. Notify in public channel
             privacy_msg = f"🔒 **Privacy Protection**: Hi {message.author.mention}, I've sent your requested health data to our **Direct Messages** to keep it peronal! 📬"
@@ -314,7 +545,7 @@ class HealthButlerDiscordBot(Client):
             if "/trends" in content_lower or "trend" in content_lower:
                 await dm_channel.send("🔍 Analyzing your health trends... (Redirected from public channel)")
                 # ... existing trends logic ...
-                profile = pu.get_user_profile(author_id)
+                profile = await pu.get_user_profile_async(author_id)
                 historical_data = pu.profile_db.get_monthly_trends_raw(author_id) if pu.profile_db else []
                 analysis = await self.analytics_agent.analyze_trends(historical_data, profile)
                 embed = HealthButlerEmbed.build_trends_embed(profile.get("name", "User"), analysis, historical_data)
@@ -328,11 +559,11 @@ class HealthButlerDiscordBot(Client):
 
             # Profile Redirection
             if ip._is_profile_query(content_lower):
-                await self._send_user_profile_embed(dm_channel, author_id, pu.get_user_profile(author_id))
+                await self._send_user_profile_embed(dm_channel, author_id, await pu.get_user_profile_async(author_id))
                 return
 
         if message.content.strip().lower() == "/trends":
-            profile = pu.get_user_profile(author_id)
+            profile = await pu.get_user_profile_async(author_id)
             if not profile or not profile.get("name"):
                 await message.channel.send("⚠️ You need to complete your profile first! Use `/setup` or type anything health-related.")
                 return
@@ -361,7 +592,7 @@ class HealthButlerDiscordBot(Client):
             return
 
         if message.content.strip().lower() == "/roulette":
-            profile = pu.get_user_profile(author_id)
+            profile = await pu.get_user_profile_async(author_id)
             if not profile or not profile.get("name"):
                 await message.channel.send("⚠️ You need to complete your profile first! Use `/setup` or type anything health-related.")
                 return
@@ -379,7 +610,6 @@ class HealthButlerDiscordBot(Client):
                 ),
                 color=discord.Color.green()
             )
-            from src.discord_bot.roulette_view import MealInspirationView
             view = MealInspirationView(author_id, remaining)
             await message.channel.send(embed=embed, view=view)
             return
@@ -393,10 +623,10 @@ class HealthButlerDiscordBot(Client):
             else: await message.channel.send("⚠️ Use `/demo` first.")
             return
 
-        if pu.demo_mode and str(message.author.id) != pu.demo_user_id: return
+        if pu.demo_mode and author_id != pu.demo_user_id: return
 
         # Load profile (prefer in-memory demo profile, fallback to persisted profile)
-        profile = pu.get_user_profile(str(message.author.id))
+        profile = await pu.get_user_profile_async(author_id)
         
         # 1. Profile Queries (Who am I?)
         if ip._is_profile_query(content_lower):
@@ -416,7 +646,7 @@ class HealthButlerDiscordBot(Client):
         try:
             image_attachment = next((a for a in message.attachments if a.content_type and a.content_type.startswith('image/')), None)
             user_context = {
-                "user_id": str(message.author.id),
+                "user_id": author_id,
                 "username": message.author.display_name,
                 "name": profile.get("name", message.author.display_name),
                 "age": profile.get("age", 30),
@@ -431,70 +661,135 @@ class HealthButlerDiscordBot(Client):
                 "daily_intake": profile.get("meals", [])
             }
 
-            async with message.channel.typing():
-                if image_attachment:
-                    image_path = f"/tmp/{image_attachment.filename}"
-                    await image_attachment.save(image_path)
+            # Coalesce duplicate in-flight requests (double-sends, re-uploaded photos) per user.
+            inflight_key = (
+                author_id,
+                f"{image_attachment.filename}:{image_attachment.size}" if image_attachment else content_lower,
+            )
+            if inflight_key in self._inflight:
+                logger.info("⏭️ Skipping duplicate in-flight request from %s", message.author)
+                return
+            self._inflight.add(inflight_key)
+
+            try:
+                async with message.channel.typing():
+                    if image_attachment:
+                        # Keep the upload in memory; no /tmp round-trip or same-filename clashes.
+                        image_bytes = await image_attachment.read()
                     
-                    # Iterative status message for streaming feedback
-                    status_msg = await message.channel.send("📸 *Image received, analyzing components...*")
+                        # Iterative status message for streaming feedback
+                        status_msg = await message.channel.send("📸 *Image received, analyzing components...*")
                     
-                    async def progress_update(state: str, status_text: str):
+                        async def progress_update(state: str, status_text: str):
+                            try:
+                                await status_msg.edit(content=status_text)
+                            except Exception:
+                                pass
+
                         try:
-                            await status_msg.edit(content=status_text)
+                            result = await self.swarm.execute_async(
+                                user_input="Analyze this meal", 
+                                image_bytes=image_bytes, 
+                                user_context=user_context,
+                                progress_callback=progress_update
+                            )
                         except Exception:
-                            pass
-
-                    try:
-                        result = await self.swarm.execute_async(
-                            user_input="Analyze this meal", 
-                            image_path=image_path, 
+                            try:
+                                await status_msg.delete()
+                            except Exception:
+                                pass
+                            raise
+                    else:
+                        # Text replies are sent as they are generated rather than after the full response.
+                        await self._stream_swarmed_response(
+                            message.channel,
+                            message.content,
+                            author_id,
                             user_context=user_context,
-                            progress_callback=progress_update
                         )
-                    finally:
-                        if os.path.exists(image_path):
-                            os.remove(image_path)
+                        return
+
+                    # Persist scanned meals only (image uploads). Text-only nutrition queries should NOT
+                    # auto-affect consumed totals.
+                    # Parse once; the payload is shared by meal persistence and embed rendering.
+                    latest_meal = None
+                    parsed = self._extract_json_payload(result.get("response") or "")
+                    if image_attachment:
                         try:
-                            await status_msg.delete()
+                            if isinstance(parsed, dict):
+                                # Vision payloads may only carry total_confidence; settle on one key
+                                # here so the gate, the persist job and MealLogView read the same value.
+                                confidence = parsed.get("confidence_score") or parsed.get("total_confidence")
+                                if confidence is not None:
+                                    parsed["confidence_score"] = confidence
+                            macros = (parsed or {}).get("total_macros", {}) if isinstance(parsed, dict) else {}
+                            calories = self._to_float(macros.get("calories", 0), 0.0)
+                            confidence = self._to_float((parsed or {}).get("confidence_score", 0.0), 0.0)
+                            # Avoid logging "no food detected" / 0-kcal scans automatically.
+                            if calories > 0 and confidence >= 0.10:
+                                latest_meal = await self._persist_meal_data(parsed, author_id, notify=message.channel)
                         except Exception:
-                            pass
-                else:
-                    result = await self.swarm.execute_async(
-                        user_input=message.content, 
-                        user_context=user_context
+                            latest_meal = None
+
+                    # The reply replaces the status message rather than following a delete.
+                    await self._send_swarmed_response(
+                        _StatusReply(message.channel, status_msg),
+                        result["response"],
+                        author_id,
+                        latest_meal=latest_meal,
+                        scan_mode=bool(image_attachment),
+                        data=parsed,
                     )
-
-                # Persist scanned meals only (image uploads). Text-only nutrition queries should NOT
-                # auto-affect consumed totals.
-                latest_meal = None
-                if image_attachment:
-                    try:
-                        parsed = self._extract_json_payload(result.get("response") or "")
-                        macros = (parsed or {}).get("total_macros", {}) if isinstance(parsed, dict) else {}
-                        calories = self._to_float(macros.get("calories", 0), 0.0)
-                        confidence = self._to_float(
-                            (parsed or {}).get("confidence_score", (parsed or {}).get("total_confidence", 0.0)),
-                            0.0,
-                        )
-                        # Avoid logging "no food detected" / 0-kcal scans automatically.
-                        if calories > 0 and confidence >= 0.10:
-                            latest_meal = await self._persist_meal_data(result["response"], str(message.author.id))
-                    except Exception:
-                        latest_meal = None
-
-                await self._send_swarmed_response(
-                    message.channel,
-                    result["response"],
-                    str(message.author.id),
-                    latest_meal=latest_meal,
-                    scan_mode=bool(image_attachment),
-                )
+            finally:
+                self._inflight.discard(inflight_key)
 
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             await message.channel.send(f"⚠️ Error: {str(e)}")
 
+    async def _stream_swarmed_response(
+        self,
+        channel,
+        user_input: str,
+        interaction_user_id: str,
+        user_context: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Forward swarm output to the channel in ~1900-char messages as it streams in."""
+        MAX_LEN = 1900
+        buf: List[str] = []
+        length = 0
+        sent: List[str] = []
+        streaming: Optional[bool] = None
+
+        async for piece in self.swarm.execute_stream(user_input=user_input, user_context=user_context):
+            buf.append(piece)
+            length += len(piece)
+            if streaming is None:
+                head = "".join(buf).lstrip()
+                if not head:
+                    continue
+                # Structured payloads render as embeds, so they have to be buffered whole.
+                streaming = not head.startswith(("{", "[", "```"))
+                buf = [head]
+                length = len(head)
+            if streaming:
+                while length >= MAX_LEN:
+                    text = "".join(buf)
+                    await channel.send(text[:MAX_LEN])
+                    sent.append(text[:MAX_LEN])
+                    buf = [text[MAX_LEN:]]
+                    length = len(buf[0])
+
+        if not streaming:
+            await self._send_swarmed_response(channel, "".join(buf), interaction_user_id)
+            return
+
+        tail = "".join(buf).rstrip()
+        if tail:
+            await channel.send(tail)
+            sent.append(tail)
+        await asyncio.to_thread(self._persist_chat_message, str(interaction_user_id), "assistant", "".join(sent))
+
     async def _send_swarmed_response(
         self,
         channel,
@@ -503,11 +798,22 @@ class HealthButlerDiscordBot(Client):
         latest_meal: Optional[Dict[str, Any]] = None,
         *,
         scan_mode: bool = False,
+        data: Optional[Dict[str, Any]] = None,
     ):
+        clean_str = response.strip()
+        # Write the transcript in a worker thread while the reply goes out.
+        persist = asyncio.ensure_future(
+            asyncio.to_thread(self._persist_chat_message, str(interaction_user_id), "assistant", clean_str)
+        )
         try:
-            clean_str = response.strip()
-            self._persist_chat_message(str(interaction_user_id), "assistant", clean_str)
-            data = self._extract_json_payload(clean_str)
+            # Fast path: every payload the extractor can return contains "{", so
+            # plain prose skips the JSON scan entirely.
+            if data is None and "{" not in clean_str:
+                await self._send_text_chunks(channel, clean_str)
+                return
+
+            if data is None:
+                data = self._extract_json_payload(clean_str)
 
             # If we have structured data, use the Unified Embed Design
             if isinstance(data, dict):
@@ -516,7 +822,6 @@ class HealthButlerDiscordBot(Client):
                     embed = self._build_nutrition_embed(data)
                     view = None
                     if scan_mode:
-                        from src.discord_bot.views import MealLogView
                         view = MealLogView(
                             self,
                             user_id=str(interaction_user_id),
@@ -524,7 +829,7 @@ class HealthButlerDiscordBot(Client):
                             logged_meal=latest_meal,
                         )
                         # Add a visible status marker at send-time (so user doesn't need to click).
-                        if latest_meal and latest_meal.get("meal_id"):
+                        if latest_meal and (latest_meal.get("meal_id") or pu._meal_write_pending(latest_meal)):
                             embed.title = "✅ " + (embed.title or "Nutrition Analysis")
                         else:
                             embed.title = "📝 " + (embed.title or "Nutrition Analysis")
@@ -565,16 +870,25 @@ class HealthButlerDiscordBot(Client):
                 return
 
             # Fallback for text-only responses
-            MAX_LEN = 1900
-            if len(clean_str) > MAX_LEN:
-                for i in range(0, len(clean_str), MAX_LEN):
-                    await channel.send(clean_str[i:i+MAX_LEN])
-            else:
-                await channel.send(clean_str)
+            await self._send_text_chunks(channel, clean_str)
 
         except Exception as e:
-            logger.error(f"Response handling error: {e}")
+            logger.error("Response handling error: %s", e)
             await channel.send(f"⚠️ Error processing response: {str(e)[:100]}")
+        finally:
+            await persist
+
+    async def _send_text_chunks(self, channel, text: str) -> None:
+        """Send plain text, split into Discord-sized messages."""
+        MAX_LEN = 1900
+        if len(text) > MAX_LEN:
+            # Slice everything up front so the send loop does no string work.
+            # Chunks stay sequential: concurrent sends to one channel can land out of order.
+            chunks = [text[i:i + MAX_LEN] for i in range(0, len(text), MAX_LEN)]
+            for chunk in chunks:
+                await channel.send(chunk)
+        else:
+            await channel.send(text)
 
     async def _send_user_profile_embed(self, channel, user_id: str, profile: Dict[str, Any]) -> None:
         """Send a profile summary embed (no agent routing)."""
@@ -662,51 +976,12 @@ class HealthButlerDiscordBot(Client):
         1) Whole-string JSON object
         2) Any embedded JSON object containing nutrition payload keys
         3) First embedded JSON object
+
+        Every call parses the text afresh, so callers may mutate the returned dict.
         """
         if not text:
             return None
-
-        clean = text.strip()
-
-        if "```json" in clean:
-            clean = clean.split("```json")[-1].split("```")[0].strip()
-        elif "```" in clean:
-            clean = clean.split("```")[-1].split("```")[0].strip()
-
-        try:
-            payload = json.loads(clean)
-            if isinstance(payload, dict):
-                return payload
-        except Exception:
-            pass
-
-        decoder = JSONDecoder()
-        candidates: List[Dict[str, Any]] = []
-        for idx, ch in enumerate(clean):
-            if ch != "{":
-                continue
-            try:
-                obj, _ = decoder.raw_decode(clean, idx)
-                if isinstance(obj, dict):
-                    candidates.append(obj)
-            except Exception:
-                continue
-
-        if not candidates:
-            return None
-
-        preferred = next(
-            (
-                obj
-                for obj in candidates
-                if "dish_name" in obj and "total_macros" in obj
-            ),
-            None,
-        )
-        if preferred:
-            return preferred
-
-        return candidates[0]
+        return _json_payload(text)
 
     def _to_float(self, value: Any, default: float = 0.0) -> float:
         try:
@@ -810,7 +1085,8 @@ class HealthButlerDiscordBot(Client):
         dt = data.get("detailed_nutrients", {})
         confidence = data.get("confidence_score", 0.9)
         
-        stars = "★" * min(5, max(0, int(confidence * 5))) + "☆" * (5 - min(5, max(0, int(confidence * 5))))
+        n_stars = min(5, max(0, int(confidence * 5)))
+        stars = "★" * n_stars + "☆" * (5 - n_stars)
         title = f"Nutrition Analysis: {dish} • {int(confidence*100)}% Confidence"
         embed = Embed(title=title, color=discord.Color.green())
 
@@ -832,27 +1108,15 @@ class HealthButlerDiscordBot(Client):
         
         embed.description = f"🔥 **{cals}** kcal | 🍖 **{p}g** P | 🍞 **{c}g** C | 🥑 **{f}g** F"
 
-        total_g = p + c + f
-        if total_g > 0:
-            def get_bar(val):
-                pct = int((val / total_g) * 20)
-                return "█" * pct + "░" * (20 - pct)
-
-            def color_bar(val, marker: str):
-                pct = int((val / total_g) * 12)
-                return marker * pct + "⬛" * (12 - pct)
-            
-            p_pct = (p / total_g) * 100
-            c_pct = (c / total_g) * 100
-            f_pct = (f / total_g) * 100
-            
+        if p + c + f > 0:
+            p_pct, c_pct, f_pct, p_bar, c_bar, f_bar = _macro_split(p, c, f)
             breakdown = (
                 f"🍖 **Protein** {p_pct:2.0f}% • {round(p, 1)}g\n"
-                f"{color_bar(p, '🟦')}\n"
+                f"{_MACRO_BARS['🟦'][p_bar]}\n"
                 f"🍞 **Carbs** {c_pct:2.0f}% • {round(c, 1)}g\n"
-                f"{color_bar(c, '🟨')}\n"
+                f"{_MACRO_BARS['🟨'][c_bar]}\n"
                 f"🥑 **Fat** {f_pct:2.0f}% • {round(f, 1)}g\n"
-                f"{color_bar(f, '🟩')}"
+                f"{_MACRO_BARS['🟩'][f_bar]}"
             )
             embed.add_field(name="📊 Macros Breakdown", value=breakdown, inline=False)
 
@@ -861,16 +1125,15 @@ class HealthButlerDiscordBot(Client):
         budget = data.get("remaining_budget", {})
         if dv or budget:
             def render_impact_line(label, current_pct, remaining_val, unit="", marker="🟧"):
-                filled = int(min(100, current_pct) / 10)
-                bar = marker * filled + "⬜" * (10 - filled)
+                bar = _IMPACT_BARS[marker][max(0, int(min(100, current_pct) / 10))]
                 return f"**{label}**: `{bar}` **{current_pct:.1f}%**\n➡️ *Remaining: {remaining_val} {unit}*"
 
-            impact_text = (
-                render_impact_line("Calories", dv.get("calories", 0), budget.get("calories", 0), "kcal", "🟧") + "\n" +
-                render_impact_line("Protein", dv.get("protein", 0), budget.get("protein", 0), "g", "🟦") + "\n" +
-                render_impact_line("Carbs", dv.get("carbs", 0), budget.get("carbs", 0), "g", "🟨") + "\n" +
-                render_impact_line("Fat", dv.get("fat", 0), budget.get("fat", 0), "g", "🟩")
-            )
+            impact_text = "\n".join((
+                render_impact_line("Calories", dv.get("calories", 0), budget.get("calories", 0), "kcal", "🟧"),
+                render_impact_line("Protein", dv.get("protein", 0), budget.get("protein", 0), "g", "🟦"),
+                render_impact_line("Carbs", dv.get("carbs", 0), budget.get("carbs", 0), "g", "🟨"),
+                render_impact_line("Fat", dv.get("fat", 0), budget.get("fat", 0), "g", "🟩"),
+            ))
             embed.add_field(name="📈 Daily Impact & Remaining Budget", value=impact_text, inline=False)
 
         if breakdown_rows:
@@ -965,7 +1228,7 @@ class HealthButlerDiscordBot(Client):
                     raw_payload=rec,
                 )
         except Exception as e:
-            logger.warning(f"Failed to persist fitness plan: {e}")
+            logger.warning("Failed to persist fitness plan: %s", e)
 
     async def _send_daily_summary_embed(self, channel, user_id: str, latest_meal: Optional[Dict[str, Any]] = None):
         """Send a 'Today's Summary' embed as requested by user."""
@@ -975,7 +1238,7 @@ class HealthButlerDiscordBot(Client):
         # Demo mode: compute totals from in-memory meal log (no DB dependency).
         if pu.demo_mode and pu.demo_user_id and str(user_id) == str(pu.demo_user_id):
             try:
-                profile = pu._demo_user_profile.get(str(user_id)) or pu.get_user_profile(str(user_id)) or {"meals": []}
+                profile = pu._demo_user_profile.get(str(user_id)) or await pu.get_user_profile_async(str(user_id)) or {"meals": []}
                 meals = profile.get("meals", []) or []
                 consumed = sum(float((m.get("macros") or {}).get("calories", 0) or 0) for m in meals)
                 meals_count = len(meals)
@@ -997,15 +1260,18 @@ class HealthButlerDiscordBot(Client):
                     embed.add_field(name="⚠️ Status", value=f"Over target by **{abs(remaining)}** kcal", inline=False)
                 await channel.send(embed=embed)
             except Exception as e:
-                logger.error(f"Failed to send daily summary (demo): {e}")
+                logger.error("Failed to send daily summary (demo): %s", e)
             return
 
         if not pu.profile_db:
             return
         
         try:
-            profile = pu.get_user_profile(user_id)
-            stats = pu.profile_db.get_today_stats(user_id)
+            # Independent lookups: overlap the two Supabase round-trips.
+            profile, stats = await asyncio.gather(
+                pu.get_user_profile_async(user_id),
+                asyncio.to_thread(pu.profile_db.get_today_stats, user_id),
+            )
             target = pu.calculate_daily_target(profile)
             
             consumed = stats["total_calories"]
@@ -1039,12 +1305,17 @@ class HealthButlerDiscordBot(Client):
             await channel.send(embed=embed)
             
         except Exception as e:
-            logger.error(f"Failed to send daily summary: {e}")
+            logger.error("Failed to send daily summary: %s", e)
+
+    async def _persist_meal_data(
+        self, data: Optional[Dict[str, Any]], user_id: str, notify: Optional[Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Persist parsed meal data - in-memory for demo, Supabase for real users.
 
-    async def _persist_meal_data(self, response: str, user_id: str) -> Optional[Dict[str, Any]]:
-        """Extract and persist meal data - in-memory for demo, Supabase for real users."""
+        `notify` is the channel told when a queued Supabase insert fails, since the
+        reply has already shown the meal as logged.
+        """
         try:
-            data = self._extract_json_payload(response)
             if not data:
                 return None
 
@@ -1052,77 +1323,107 @@ class HealthButlerDiscordBot(Client):
                 m = data["total_macros"]
                 meal_record = {
                     "meal_id": None,
-                    "time": datetime.now(LOCAL_TZ).strftime("%H:%M"),
+                    "time": pu._now_hhmm(),
                     "dish": data["dish_name"],
-                    "macros": data["total_macros"]
+                    "macros": dict(data["total_macros"])
                 }
 
                 # Demo mode: in-memory only
                 if pu.demo_mode and user_id == pu.demo_user_id:
-                    if user_id not in pu._demo_user_profile:
-                        pu._demo_user_profile[user_id] = {"meals": []}
                     meal_record["meal_id"] = f"demo-{uuid.uuid4().hex[:10]}"
-                    pu._demo_user_profile[user_id].setdefault("meals", []).append(meal_record)
-                    logger.info(f"📝 Demo meal saved: {data['dish_name']}")
+                    pu._append_meal(pu._demo_user_profile.setdefault(user_id, {"meals": []}), meal_record)
+                    logger.info("📝 Demo meal saved: %s", data['dish_name'])
 
                 # Real user: persist to Supabase
                 elif pu.profile_db:
-                    from datetime import date
-                    today = date.today()
-                    calories = float(m.get('calories', 0) or 0)
-                    protein = float(m.get('protein', 0) or 0)
-                    carbs = float(m.get('carbs', 0) or 0)
-                    fat = float(m.get('fat', 0) or 0)
-
-                    # Keep legacy daily_logs write for backwards compatibility (tests + older schema).
-                    try:
-                        pu.profile_db.create_daily_log(
-                            discord_user_id=user_id,
-                            log_date=today,
-                            calories_intake=calories,
-                            protein_g=protein,
-                        )
-                    except Exception:
-                        pass
-
-                    # 1. Create detailed meal record (source of truth for totals)
-                    created = pu.profile_db.create_meal(
-                        discord_user_id=user_id,
-                        dish_name=data["dish_name"],
-                        calories=calories,
-                        protein_g=protein,
-                        carbs_g=carbs,
-                        fat_g=fat,
-                        confidence_score=data.get("confidence_score") or data.get("total_confidence", 0.0)
+                    # The write is off the reply path: a worker fills in meal_id once the
+                    # insert lands, and MealLogView waits on it before editing/removing.
+                    pu._track_meal_write(meal_record)
+                    job = {
+                        "discord_user_id": user_id,
+                        "dish_name": data["dish_name"],
+                        **{column: float(m.get(key, 0) or 0) for key, column in _MACRO_COLUMNS},
+                        "confidence_score": data.get("confidence_score") or 0.0,
+                    }
+                    # The batcher is the only queue: submitting never blocks the handler.
+                    insert = pu.profile_db.submit_meal(**job)
+                    write = asyncio.create_task(
+                        self._complete_meal_write(meal_record, job, date.today(), insert, notify)
                     )
-                    meal_record["meal_id"] = (created or {}).get("id")
-                    logger.info(f"💾 Detailed meal persisted to DB: {data['dish_name']} ({calories} kcal)")
-
-                    # 2. Recompute daily log totals from meals (keeps daily_logs consistent)
-                    try:
-                        pu.profile_db.recompute_daily_log_from_meals(user_id, today)
-                    except Exception:
-                        pass
-
-                    # Also update local cache
-                    if user_id in pu._user_profiles_cache:
-                        pu._user_profiles_cache[user_id].setdefault("meals", []).append(meal_record)
+                    self._meal_writes.add(write)
+                    write.add_done_callback(self._meal_writes.discard)
 
                 return meal_record
 
         except Exception as e:
-            logger.debug(f"Meal persist error: {e}")
+            logger.debug("Meal persist error: %s", e)
 
         return None
 
+    async def _complete_meal_write(
+        self,
+        meal_record: Dict[str, Any],
+        job: Dict[str, Any],
+        log_date: date,
+        insert: "Future[Optional[Dict[str, Any]]]",
+        notify: Optional[Any],
+    ) -> None:
+        """Wait for a queued meal insert, then refresh daily_logs and the local cache."""
+        try:
+            try:
+                created = await asyncio.wait_for(asyncio.wrap_future(insert), timeout=MEAL_INSERT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"meal insert not confirmed within {MEAL_INSERT_TIMEOUT:.0f}s") from None
+            # Meal insert is the source of truth; daily_logs is recomputed from meals
+            # in a worker thread so the blocking HTTP call stays off the event loop.
+            await asyncio.to_thread(pu.profile_db.refresh_daily_log, job["discord_user_id"], log_date)
+            meal_record["meal_id"] = (created or {}).get("id")
+            logger.info("💾 Detailed meal persisted to DB: %s (%s kcal)", job["dish_name"], job["calories"])
+
+            # Also update local cache
+            cached = pu._user_profiles_cache.get(job["discord_user_id"])
+            if cached is not None:
+                pu._append_meal(cached, meal_record)
+        except Exception as e:
+            logger.warning("Queued meal persist failed for %s: %s", job["discord_user_id"], e)
+            # No meal_id means MealLogView treats the meal as not logged once the
+            # pending marker is cleared below; tell the user their ✅ did not stick.
+            meal_record["meal_id"] = None
+            if notify is not None:
+                try:
+                    await notify.send(
+                        f"⚠️ <@{job['discord_user_id']}> **{job['dish_name']}** couldn't be saved to "
+                        "today's log, so it isn't counted. Please scan it again."
+                    )
+                except Exception as send_error:
+                    logger.warning("Could not report failed meal persist: %s", send_error)
+        finally:
+            pu._finish_meal_write(meal_record)
+
 # Command methods removed, logic moved to cmd module.
 
+def _install_queue_logging() -> QueueListener:
+    """Move the root handlers behind a queue so log calls never block the event loop on stderr."""
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
 def main():
-    bot = HealthButlerDiscordBot()
-    if DISCORD_TOKEN:
-        bot.run(DISCORD_TOKEN)
-    else:
-        logger.error("No DISCORD_TOKEN found.")
+    listener = _install_queue_logging()
+    try:
+        bot = HealthButlerDiscordBot()
+        if DISCORD_TOKEN:
+            bot.run(DISCORD_TOKEN, log_handler=None)
+        else:
+            logger.error("No DISCORD_TOKEN found.")
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main()
@@ -11,8 +11,10 @@ async def _on_registration_modal_submit(interaction: discord.Interaction, data:
     """Callback for v4.1 simplified RegistrationModal (Step 1/3)"""
     user_id = str(interaction.user.id)
     
-    # Initialize/Update profile buffer with metrics
-    pu._demo_user_profile[user_id] = {
+    # Fresh per-session profile buffer. It travels with the View chain and is only
+    # committed to shared state once RegistrationViewB finishes, so concurrent or
+    # restarted onboardings never overwrite each other's partial profile.
+    profile_buffer = {
         "name": data["name"],
         "age": data["age"],
         "height_cm": data["height_cm"],
@@ -33,7 +35,7 @@ async def _on_registration_modal_submit(interaction: discord.Interaction, data:
     )
     
     # Instantiate the new modular view
-    view = RegistrationViewA(user_id, pu._demo_user_profile[user_id], HealthButlerEmbed)
+    view = RegistrationViewA(user_id, profile_buffer, HealthButlerEmbed)
     
     await interaction.response.send_message(
         embed=embed,
@@ -43,7 +45,7 @@ async def _on_registration_modal_submit(interaction: discord.Interaction, data:
 
 async def handle_reset_command(message: discord.Message, HealthButlerEmbed, OnboardingGreetingView):
     """♻️ Reset user profile and cache."""
-    logger.info(f"♻️ Reset requested by {message.author}")
+    logger.info("♻️ Reset requested by %s", message.author)
     author_id = str(message.author.id)
     
     # 1. Clear DB
@@ -51,8 +53,7 @@ async def handle_reset_command(message: discord.Message, HealthButlerEmbed, Onbo
     deleted = db.delete_profile(author_id)
     
     # 2. Clear Local Cache
-    if author_id in pu._user_profiles_cache:
-        del pu._user_profiles_cache[author_id]
+    pu._user_profiles_cache.pop(author_id, None)
     
     if deleted:
         embed = HealthButlerEmbed.welcome_embed(message.author.display_name)
@@ -96,8 +97,9 @@ async def handle_settings_command(message: discord.Message):
             pu.profile_db.update_profile(author_id, preferences_json=prefs)
         
         # Update cache
-        if author_id in pu._user_profiles_cache:
-            pu._user_profiles_cache[author_id]["preferences_json"] = prefs
+        cached = pu._user_profiles_cache.get(author_id)
+        if cached is not None:
+            cached["preferences_json"] = prefs
         
         status_text = "enabled" if new_val else "disabled"
         await message.reply(f"✅ Morning Check-in successfully **{status_text}**.")
@@ -134,9 +136,8 @@ async def handle_exit_command(message: discord.Message):
     user_id = str(message.author.id)
     pu.demo_mode = False
     pu.demo_user_id = None
-    if user_id in pu._demo_user_profile:
-        del pu._demo_user_profile[user_id]
-        logger.info(f"🗑️ Cleared demo profile for user {user_id}")
+    if pu._demo_user_profile.pop(user_id, None) is not None:
+        logger.info("🗑️ Cleared demo profile for user %s", user_id)
     await message.reply("Demo mode exited. Your session data has been cleared.")
 
 
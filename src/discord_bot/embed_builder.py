@@ -342,8 +342,6 @@ class HealthButlerEmbed:
         if high == low:
             return blocks[4] * len(data)
             
-        line = ""
-        for v in data:
-            idx = int(((v - low) / (high - low)) * (len(blocks) - 1))
-            line += blocks[idx]
-        return line
+        span = high - low
+        top = len(blocks) - 1
+        return "".join(blocks[int(((v - low) / span) * top)] for v in data)
@@ -0,0 +1,16 @@
+"""Shared HTTP connection pool for the bot's outbound API clients."""
+
+from functools import lru_cache
+
+import httpx
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled httpx client (keep-alive, HTTP/2)."""
+    return httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=30.0),
+        timeout=10.0,
+        http2=True,
+        follow_redirects=True,
+    )
@@ -1,12 +1,10 @@
 import re
 from typing import Optional
 
-def _is_profile_query(text_lower: str) -> bool:
-    """Return True when the user is asking about their own profile/identity."""
-    text_lower = (text_lower or "").strip().lower()
-    if not text_lower:
-        return False
-    patterns = [
+# Classifier patterns run on every message, so they are compiled once here.
+_PROFILE_PATTERNS = tuple(
+    re.compile(p)
+    for p in (
         r"\bwho\s*am\s*i\b",
         r"\bwhoami\b",
         r"\bmy\s+profile\b",
@@ -17,15 +15,26 @@ def _is_profile_query(text_lower: str) -> bool:
         r"\b(daily\s+)?calorie\s+target\b",
         r"\btarget\s+calories\b",
         r"\bdaily\s+target\b",
-    ]
-    return any(re.search(p, text_lower) for p in patterns)
+    )
+)
+_SUMMARY_TAIL_RE = re.compile(r"\b(summary|stats)\b\s*\??$")
+_TODAY_SUMMARY_RE = re.compile(r"\b(today|todays|today's)\b.*\b(summary|stats|log|intake)\b")
+_TRENDS_RE = re.compile(r"\b(trends?|analytics|monthly\s+report)\b")
+
+
+def _is_profile_query(text_lower: str) -> bool:
+    """Return True when the user is asking about their own profile/identity."""
+    text_lower = (text_lower or "").strip().lower()
+    if not text_lower:
+        return False
+    return any(p.search(text_lower) for p in _PROFILE_PATTERNS)
 
 
 def _is_daily_summary_query(text_lower: str) -> bool:
     text_lower = (text_lower or "").strip().lower()
     if not text_lower:
         return False
-    if re.search(r"\b(summary|stats)\b\s*\??$", text_lower):
+    if _SUMMARY_TAIL_RE.search(text_lower):
         return True
     
     # Exclude if it looks like an actionable request (e.g. "help me work it off")
@@ -33,7 +42,7 @@ def _is_daily_summary_query(text_lower: str) -> bool:
     if any(k in text_lower for k in action_keywords):
         return False
 
-    if re.search(r"\b(today|todays|today's)\b.*\b(summary|stats|log|intake)\b", text_lower):
+    if _TODAY_SUMMARY_RE.search(text_lower):
         return True
     if "today" in text_lower and any(
         k in text_lower for k in ("calorie", "calories", "kcal", "protein", "carb", "fat", "meals")
@@ -70,7 +79,7 @@ def _is_sensitive_query(text_lower: str) -> bool:
     is_profile = _is_profile_query(text_lower)
     
     # 2. Check for "trends" explicitly
-    is_trends = "/trends" in text_lower or re.search(r"\b(trends?|analytics|monthly\s+report)\b", text_lower)
+    is_trends = "/trends" in text_lower or _TRENDS_RE.search(text_lower)
     
     return is_summary or is_profile or is_trends
 
@@ -31,6 +31,8 @@ class RegistrationModal(ui.Modal, title='Step 1/3: Basic Metrics 🟢⚪⚪'):
         required=True
     )
 
+    __slots__ = ("on_submit_callback",)
+
     def __init__(self, on_submit_callback):
         super().__init__()
         self.on_submit_callback = on_submit_callback
@@ -63,5 +65,5 @@ class RegistrationModal(ui.Modal, title='Step 1/3: Basic Metrics 🟢⚪⚪'):
         except ValueError:
             await interaction.response.send_message("⚠️ Please enter valid numeric values.", ephemeral=True)
         except Exception as e:
-            logger.error(f"Error in RegistrationModal: {e}")
+            logger.error("Error in RegistrationModal: %s", e)
             await interaction.response.send_message("⚠️ An unexpected error occurred.", ephemeral=True)
@@ -8,42 +8,194 @@ Provides persistent storage for:
 
 import os
 import json
-from typing import Dict, Any, Optional, List, Any as _Any
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from time import monotonic
+from typing import Dict, Any, Optional, List, Set, Tuple, Any as _Any
 from datetime import date, datetime, timedelta
 try:
-    from supabase import create_client, Client  # type: ignore
+    from supabase import create_client, Client, ClientOptions  # type: ignore
 except Exception:  # pragma: no cover
     create_client = None  # type: ignore
     Client = _Any  # type: ignore
+    ClientOptions = None  # type: ignore
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Connection settings are read once at import; the service-role key wins over the anon key.
+SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
+SUPABASE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "") or os.getenv("SUPABASE_KEY", "")
+
+# Profile rows change rarely; serve repeat reads from memory for a few minutes.
+# Entries older than the soft TTL are still returned, but trigger a background re-read.
+PROFILE_CACHE_TTL = 300.0
+PROFILE_CACHE_SOFT_TTL = 60.0
+PROFILE_CACHE_MAXSIZE = 2048
+
+# Upper bound on rows sent in one coalesced `meals` INSERT.
+MEAL_BATCH_MAX = 100
+# Longest a caller waits for its queued meal row to be inserted.
+MEAL_INSERT_TIMEOUT = 30.0
+
+# Opt-in: send meal batches through an RPC that commits without waiting for the WAL
+# flush (a lost meal row can be re-logged from the Discord message). Requires:
+#
+#   create or replace function bulk_insert_meals(rows jsonb) returns setof meals
+#   language plpgsql as $$
+#   begin
+#     set local synchronous_commit = off;
+#     return query
+#       insert into meals (user_id, dish_name, calories, protein_g, carbs_g, fat_g, confidence_score)
+#       select user_id, dish_name, calories, protein_g, carbs_g, fat_g, confidence_score
+#       from jsonb_populate_recordset(null::meals, rows)
+#       returning *;
+#   end $$;
+#
+# profiles and daily_logs writes keep the default synchronous commit.
+MEAL_ASYNC_COMMIT_ENV = "SUPABASE_MEALS_ASYNC_COMMIT"
+
+# Error codes meaning an RPC function does not exist: PostgREST's and Postgres' SQLSTATE.
+MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883"})
+
+
+class _MealInsertBatcher:
+    """Coalesce concurrent `meals` inserts into multi-row INSERT requests.
+
+    A single worker thread sends each batch. Rows submitted while a request
+    is in flight are sent together in the next one, so an idle bot pays no
+    extra latency and a busy one pays one round-trip per batch.
+    """
+
+    def __init__(self, client: _Any, max_batch: int = MEAL_BATCH_MAX):
+        self._client = client
+        self._max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._use_rpc = os.getenv(MEAL_ASYNC_COMMIT_ENV, "").strip().lower() in {"1", "true", "yes"}
+
+    def submit(self, row: Dict[str, Any]) -> Future:
+        """Queue a row; the future resolves to the inserted row (or None).
+
+        Cancelling the future before its batch is sent drops the row.
+        """
+        future: Future = Future()
+        self._queue.put((row, future))
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="meal-batcher", daemon=True)
+                    self._worker.start()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Skip rows whose caller gave up (cancelled future) while they were queued.
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._flush(batch)
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> _Any:
+        if self._use_rpc:
+            try:
+                return self._client.rpc("bulk_insert_meals", {"rows": rows}).execute()
+            except Exception as exc:
+                # Function not deployed (or failing): use plain inserts from now on.
+                logger.warning("[ProfileDB] bulk_insert_meals RPC unavailable, using table insert: %s", exc)
+                self._use_rpc = False
+        return self._client.table("meals").insert(rows).execute()
+
+    def _flush(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        try:
+            response = self._insert([row for row, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                return
+            # One bad row must not fail everyone else's meal: retry individually.
+            logger.warning("[ProfileDB] Batched meal insert failed, retrying per row: %s", exc)
+            for item in batch:
+                self._flush([item])
+            return
+
+        data = response.data or []
+        for i, (_, future) in enumerate(batch):
+            future.set_result(data[i] if i < len(data) else None)
+
 
 class ProfileDB:
     """Supabase database client for user profile persistence."""
 
-    def __init__(self):
-        """Initialize Supabase client from environment variables."""
+    def __init__(self, http_client: Optional[_Any] = None):
+        """Initialize Supabase client from the module-level SUPABASE_URL/SUPABASE_KEY.
+
+        Args:
+            http_client: Optional shared httpx.Client so PostgREST calls reuse pooled
+                keep-alive connections instead of a client-private pool.
+        """
         if create_client is None:
             raise RuntimeError("supabase package is not installed")
-        self.url: str = os.getenv("SUPABASE_URL", "")
-        self.key: str = (
-            os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
-            or os.getenv("SUPABASE_KEY", "")
-        )
+        self.url: str = SUPABASE_URL
+        self.key: str = SUPABASE_KEY
 
         if not self.url or not self.key:
             raise RuntimeError(
                 "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY (or SUPABASE_KEY) must be set in environment variables"
             )
 
-        self.client: Client = create_client(self.url, self.key)
+        if http_client is not None:
+            self.client: Client = create_client(self.url, self.key, options=ClientOptions(httpx_client=http_client))
+        else:
+            self.client = create_client(self.url, self.key)
+
+        self._meal_batcher = _MealInsertBatcher(self.client)
+
+        # discord_user_id -> (profile row, monotonic fetch time)
+        self._profile_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        # Users with a background refresh in flight (one refresh per user at a time)
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="profile-refresh")
+        # Cleared once the get_today_stats RPC turns out to be missing (not on transient errors)
+        self._stats_rpc_available = True
+
+    @staticmethod
+    def _page_before(query, before: Optional[Any]):
+        """Keyset pagination: restrict a newest-first query to rows older than `before`.
+
+        Seeking on (user_id, created_at) reads only the next page from the index,
+        whereas an offset would scan and discard every earlier row.
+        """
+        if before is None:
+            return query
+        return query.lt("created_at", before.isoformat() if isinstance(before, datetime) else str(before))
 
     def _is_missing_column_error(self, error: Exception, column_name: str) -> bool:
         """Return True when exception indicates a missing DB column."""
         return column_name.lower() in str(error).lower()
 
+    @staticmethod
+    def _is_missing_function_error(error: Exception) -> bool:
+        """Return True when an RPC failed because the function is not deployed.
+
+        PostgREST reports an unknown function as PGRST202; Postgres itself as SQLSTATE 42883.
+        """
+        code = getattr(error, "code", None)
+        if code is not None:
+            return str(code) in MISSING_FUNCTION_CODES
+        return any(c in str(error) for c in MISSING_FUNCTION_CODES)
+
     # ============================================
     # Profile Operations
     # ============================================
@@ -54,13 +206,59 @@ class ProfileDB:
         Discord users are stored with their Discord ID as the profile UUID.
         For demo mode, we use Discord ID directly as the UUID.
         """
+        cached = self._profile_cache.get(discord_user_id)
+        if cached is not None:
+            age = monotonic() - cached[1]
+            if age < PROFILE_CACHE_TTL:
+                if age >= PROFILE_CACHE_SOFT_TTL:
+                    self._schedule_profile_refresh(discord_user_id)
+                return dict(cached[0])
+
+        row = self._fetch_profile(discord_user_id)
+        if row is None:
+            return None
+        self._store_profile(discord_user_id, row)
+        return dict(row)
+
+    def _fetch_profile(self, discord_user_id: str) -> Optional[Dict[str, Any]]:
         # Note: In production, you'd have a discord_user_id column
         # For now, we'll query profiles directly (assuming auth.users.id = discord_user_id)
         response = self.client.table("profiles").select("*").eq("id", discord_user_id).execute()
+        return response.data[0] if response.data else None
 
-        if response.data:
-            return response.data[0]
-        return None
+    def _store_profile(self, discord_user_id: str, row: Dict[str, Any]) -> None:
+        if discord_user_id not in self._profile_cache and len(self._profile_cache) >= PROFILE_CACHE_MAXSIZE:
+            # Drop the oldest insertion to stay bounded
+            self._profile_cache.pop(next(iter(self._profile_cache)), None)
+        self._profile_cache[discord_user_id] = (row, monotonic())
+
+    def _schedule_profile_refresh(self, discord_user_id: str) -> None:
+        with self._refresh_lock:
+            if discord_user_id in self._refreshing:
+                return
+            self._refreshing.add(discord_user_id)
+        self._refresh_pool.submit(self._refresh_profile, discord_user_id)
+
+    def _refresh_profile(self, discord_user_id: str) -> None:
+        """Background re-read of a stale-but-usable cache entry."""
+        try:
+            expected = self._profile_cache.get(discord_user_id)
+            row = self._fetch_profile(discord_user_id)
+            # Skip the write if a profile update invalidated the entry meanwhile.
+            if self._profile_cache.get(discord_user_id) is expected:
+                if row is None:
+                    self._profile_cache.pop(discord_user_id, None)
+                else:
+                    self._store_profile(discord_user_id, row)
+        except Exception as e:
+            logger.warning("[ProfileDB] Background profile refresh failed: %s", e)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(discord_user_id)
+
+    def invalidate_profile(self, discord_user_id: str) -> None:
+        """Forget the cached profile row so the next get_profile reads Supabase."""
+        self._profile_cache.pop(discord_user_id, None)
 
     def create_profile(
         self,
@@ -120,6 +318,8 @@ class ProfileDB:
                 response = self.client.table("profiles").insert(fallback_data).execute()
                 return response.data[0] if response.data else None
             raise
+        finally:
+            self.invalidate_profile(discord_user_id)
 
     def update_profile(
         self,
@@ -145,6 +345,8 @@ class ProfileDB:
                 response = self.client.table("profiles").update(fallback_updates).eq("id", discord_user_id).execute()
                 return response.data[0] if response.data else None
             raise
+        finally:
+            self.invalidate_profile(discord_user_id)
 
     def delete_profile(self, discord_user_id: str) -> bool:
         """Delete user profile from database.
@@ -161,6 +363,8 @@ class ProfileDB:
         except Exception as exc:
             print(f"DEBUG: Failed to delete profile for {discord_user_id}: {exc}")
             return False
+        finally:
+            self.invalidate_profile(discord_user_id)
 
     # ============================================
     # Daily Logs Operations
@@ -186,9 +390,14 @@ class ProfileDB:
         response = self.client.table("daily_logs").upsert(log_data, on_conflict="user_id,date").execute()
         return response.data[0] if response.data else None
 
-    def get_daily_logs(self, discord_user_id: str, days: int = 7) -> List[Dict[str, Any]]:
-        """Get recent daily logs for a user."""
-        response = self.client.table("daily_logs").select("*").eq("user_id", discord_user_id).order("date", desc=True).limit(days).execute()
+    def get_daily_logs(
+        self,
+        discord_user_id: str,
+        days: int = 7,
+        columns: str = "date,calories_intake,protein_g,steps_count"
+    ) -> List[Dict[str, Any]]:
+        """Get recent daily logs for a user (pass columns="*" for full rows)."""
+        response = self.client.table("daily_logs").select(columns).eq("user_id", discord_user_id).order("date", desc=True).limit(days).execute()
         return response.data
 
     # ============================================
@@ -210,7 +419,7 @@ class ProfileDB:
     # Meal Operations
     # ============================================
 
-    def create_meal(
+    def submit_meal(
         self,
         discord_user_id: str,
         dish_name: str,
@@ -219,8 +428,8 @@ class ProfileDB:
         carbs_g: int = 0,
         fat_g: int = 0,
         confidence_score: float = 0.0
-    ) -> Dict[str, Any]:
-        """Create a meal record."""
+    ) -> Future:
+        """Queue a meal insert without blocking; the future resolves to the created row."""
         meal_data = {
             "user_id": discord_user_id,
             "dish_name": dish_name,
@@ -231,33 +440,105 @@ class ProfileDB:
             "confidence_score": float(confidence_score),
         }
         
-        response = self.client.table("meals").insert(meal_data).execute()
-        return response.data[0] if response.data else None
+        # Concurrent uploads share one INSERT, sent by the batcher's thread.
+        return self._meal_batcher.submit(meal_data)
+
+    def create_meal(
+        self,
+        discord_user_id: str,
+        dish_name: str,
+        calories: int = 0,
+        protein_g: int = 0,
+        carbs_g: int = 0,
+        fat_g: int = 0,
+        confidence_score: float = 0.0
+    ) -> Dict[str, Any]:
+        """Create a meal record, waiting at most MEAL_INSERT_TIMEOUT seconds for it."""
+        future = self.submit_meal(
+            discord_user_id=discord_user_id,
+            dish_name=dish_name,
+            calories=calories,
+            protein_g=protein_g,
+            carbs_g=carbs_g,
+            fat_g=fat_g,
+            confidence_score=confidence_score,
+        )
+        try:
+            return future.result(timeout=MEAL_INSERT_TIMEOUT)
+        except FuturesTimeoutError:
+            # Drop the row if it is still queued so a late insert can't surprise the user.
+            future.cancel()
+            raise TimeoutError(f"Meal insert not confirmed within {MEAL_INSERT_TIMEOUT:.0f}s") from None
+
+    def get_meals(
+        self,
+        discord_user_id: str,
+        limit: int = 10,
+        columns: str = "id,dish_name,calories,protein_g,carbs_g,fat_g,confidence_score,created_at",
+        before: Optional[Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Get recent meals for a user (pass columns="*" for full rows).
 
-    def get_meals(self, discord_user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent meals for a user."""
-        response = self.client.table("meals").select("*").eq("user_id", discord_user_id).order("created_at", desc=True).limit(limit).execute()
+        Pass the last row's ``created_at`` as ``before`` to fetch the next page.
+        """
+        query = self.client.table("meals").select(columns).eq("user_id", discord_user_id)
+        response = self._page_before(query, before).order("created_at", desc=True).limit(limit).execute()
         return response.data
 
     def get_today_stats(self, discord_user_id: str) -> Dict[str, Any]:
-        """Aggregate calories and meal count for the current day."""
+        """Aggregate calories and meal count for the current day.
+
+        Prefers a server-side aggregate so a single row crosses the wire:
+
+            create or replace function get_today_stats(uid text, since timestamptz)
+            returns table (meal_count bigint, total_calories numeric, total_protein numeric,
+                           total_carbs numeric, total_fat numeric)
+            language sql stable as $$
+              select count(*), coalesce(sum(calories), 0)::numeric, coalesce(sum(protein_g), 0)::numeric,
+                     coalesce(sum(carbs_g), 0)::numeric, coalesce(sum(fat_g), 0)::numeric
+              from meals where user_id = uid and created_at >= since
+            $$;
+
+        Without that function the day's meal rows are fetched and summed here.
+        """
         # Get UTC today start
         today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-        
+
+        if self._stats_rpc_available:
+            try:
+                response = self.client.rpc(
+                    "get_today_stats", {"uid": discord_user_id, "since": today_start}
+                ).execute()
+                if response.data:
+                    return dict(response.data[0])
+            except Exception as e:
+                if self._is_missing_function_error(e):
+                    logger.warning("[ProfileDB] get_today_stats RPC not deployed, aggregating client-side: %s", e)
+                    self._stats_rpc_available = False
+                else:
+                    # Transient failure: fall back for this call only and try the RPC again next time.
+                    logger.warning("[ProfileDB] get_today_stats RPC failed, aggregating client-side: %s", e)
+
         response = self.client.table("meals").select("calories", "protein_g", "carbs_g", "fat_g")\
             .eq("user_id", discord_user_id)\
             .gte("created_at", today_start)\
             .execute()
         
         meals = response.data
-        stats = {
+        # One pass over the rows, accumulating in locals
+        kcal = protein = carbs = fat = 0
+        for m in meals:
+            kcal += m.get("calories") or 0
+            protein += m.get("protein_g") or 0
+            carbs += m.get("carbs_g") or 0
+            fat += m.get("fat_g") or 0
+        return {
             "meal_count": len(meals),
-            "total_calories": sum(m.get("calories", 0) for m in meals if m.get("calories")),
-            "total_protein": sum(m.get("protein_g", 0) for m in meals if m.get("protein_g")),
-            "total_carbs": sum(m.get("carbs_g", 0) for m in meals if m.get("carbs_g")),
-            "total_fat": sum(m.get("fat_g", 0) for m in meals if m.get("fat_g"))
+            "total_calories": kcal,
+            "total_protein": protein,
+            "total_carbs": carbs,
+            "total_fat": fat,
         }
-        return stats
 
     def update_meal(self, meal_id: str, **updates) -> Optional[Dict[str, Any]]:
         """Update a meal record by primary key `id`.
@@ -281,9 +562,12 @@ class ProfileDB:
         start = datetime.combine(log_date, datetime.min.time()).isoformat()
         end = datetime.combine(log_date, datetime.max.time()).isoformat()
 
+        # Totals are re-derived and upserted on (user_id, date), so repeated calls are
+        # idempotent; no read-modify-write of daily_logs is needed. Only fetch the two
+        # columns daily_logs stores.
         response = (
             self.client.table("meals")
-            .select("calories,protein_g,carbs_g,fat_g,created_at")
+            .select("calories,protein_g")
             .eq("user_id", discord_user_id)
             .gte("created_at", start)
             .lte("created_at", end)
@@ -300,9 +584,59 @@ class ProfileDB:
             protein_g=total_protein,
         )
 
-    def get_chat_history(self, discord_user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Get recent chat messages for a user."""
-        response = self.client.table("chat_messages").select("*").eq("user_id", discord_user_id).order("created_at", desc=True).limit(limit).execute()
+    def persist_meal(
+        self,
+        discord_user_id: str,
+        log_date: date,
+        dish_name: str,
+        calories: float = 0,
+        protein_g: float = 0,
+        carbs_g: float = 0,
+        fat_g: float = 0,
+        confidence_score: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """Insert a meal and refresh that day's `daily_logs` totals from `meals`.
+
+        The daily log is always derived from `meals`, so there is no provisional
+        daily_logs write before the insert. A failed recompute is logged rather
+        than raised: the meal itself was saved.
+        """
+        created = self.create_meal(
+            discord_user_id=discord_user_id,
+            dish_name=dish_name,
+            calories=calories,
+            protein_g=protein_g,
+            carbs_g=carbs_g,
+            fat_g=fat_g,
+            confidence_score=confidence_score,
+        )
+        self.refresh_daily_log(discord_user_id, log_date)
+        return created
+
+    def refresh_daily_log(self, discord_user_id: str, log_date: date) -> None:
+        """Recompute a day's `daily_logs` totals after a meal insert, logging failures."""
+        try:
+            self.recompute_daily_log_from_meals(discord_user_id, log_date)
+        except Exception as e:
+            logger.warning("[ProfileDB] Failed to recompute daily log: %s", e)
+
+    def get_chat_history(
+        self,
+        discord_user_id: str,
+        limit: int = 20,
+        columns: str = "role,content,created_at",
+        before: Optional[Any] = None,
+        roles: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get recent chat messages for a user (pass columns="*" for full rows).
+
+        Pass the last row's ``created_at`` as ``before`` to fetch the next page, and
+        ``roles`` to keep only those message roles (filtered server-side).
+        """
+        query = self.client.table("chat_messages").select(columns).eq("user_id", discord_user_id)
+        if roles:
+            query = query.in_("role", roles)
+        response = self._page_before(query, before).order("created_at", desc=True).limit(limit).execute()
         return response.data
 
     # ============================================
@@ -346,7 +680,7 @@ class ProfileDB:
             return response.data or []
 
         except Exception as e:
-            logger.warning(f"[ProfileDB] Failed to fetch workout logs: {e}")
+            logger.warning("[ProfileDB] Failed to fetch workout logs: %s", e)
             # Fallback: try chat_messages
             return self._get_workout_logs_from_chat(discord_user_id, days, status)
 
@@ -361,11 +695,8 @@ class ProfileDB:
         logs = []
 
         try:
-            history = self.get_chat_history(discord_user_id, limit=500)
+            history = self.get_chat_history(discord_user_id, limit=500, roles=["workout_log"])
             for msg in history:
-                if msg.get("role") != "workout_log":
-                    continue
-
                 created_at = msg.get("created_at")
                 if created_at:
                     try:
@@ -395,7 +726,7 @@ class ProfileDB:
             return logs
 
         except Exception as e:
-            logger.warning(f"[ProfileDB] Fallback workout logs failed: {e}")
+            logger.warning("[ProfileDB] Fallback workout logs failed: %s", e)
             return []
 
     def log_workout_event(
@@ -537,7 +868,7 @@ class ProfileDB:
             }
         except Exception:
             # Fallback using chat_messages log payloads
-            history = self.get_chat_history(discord_user_id, limit=200)
+            history = self.get_chat_history(discord_user_id, limit=200, roles=["workout_log", "routine_log"])
             for msg in history:
                 role = msg.get("role", "")
                 try:
@@ -670,15 +1001,16 @@ class ProfileDB:
                 "workout_count": 0
             }
 
+        # created_at is ISO-8601, so its first 10 characters are already the YYYY-MM-DD key.
         for m in meals:
-            m_date = datetime.fromisoformat(m["created_at"].split("T")[0]).date().isoformat()
+            m_date = m["created_at"][:10]
             if m_date in daily_stats:
                 daily_stats[m_date]["calories_in"] += float(m.get("calories", 0) or 0)
                 daily_stats[m_date]["protein_g"] += float(m.get("protein_g", 0) or 0)
                 daily_stats[m_date]["meal_count"] += 1
 
         for w in workouts:
-            w_date = datetime.fromisoformat(w["created_at"].split("T")[0]).date().isoformat()
+            w_date = w["created_at"][:10]
             if w_date in daily_stats:
                 daily_stats[w_date]["calories_out"] += float(w.get("kcal_estimate", 0) or 0)
                 daily_stats[w_date]["active_minutes"] += int(w.get("duration_min", 0) or 0)
@@ -706,11 +1038,22 @@ class ProfileDB:
 
 # Singleton instance for app-wide use
 _db_instance: Optional[ProfileDB] = None
+_db_instance_lock = threading.Lock()
+
 
+def get_profile_db(http_client: Optional[_Any] = None) -> ProfileDB:
+    """Get or create singleton ProfileDB instance.
 
-def get_profile_db() -> ProfileDB:
-    """Get or create singleton ProfileDB instance."""
+    Whichever caller creates the singleton first (bot, agents, views), it is
+    bound to the process-wide pooled httpx client unless one is passed in.
+    """
     global _db_instance
     if _db_instance is None:
-        _db_instance = ProfileDB()
+        # Agents first touch the DB from worker threads; build exactly one client.
+        with _db_instance_lock:
+            if _db_instance is None:
+                if http_client is None:
+                    from src.discord_bot.http_client import get_http_client
+                    http_client = get_http_client()
+                _db_instance = ProfileDB(http_client=http_client)
     return _db_instance
@@ -1,6 +1,10 @@
+import asyncio
 import logging
 import re
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 from src.discord_bot.profile_db import ProfileDB
 
@@ -9,54 +13,152 @@ logger = logging.getLogger(__name__)
 # Vaughan, Ontario → America/Toronto
 LOCAL_TZ = ZoneInfo("America/Toronto")
 
+# (epoch minute, "HH:MM") for the last local-time lookup; replaced as one tuple so a
+# reader in another thread never pairs one minute with another minute's text.
+_last_minute: Tuple[int, str] = (-1, "")
+
+def _now_hhmm() -> str:
+    """Current LOCAL_TZ wall time as HH:MM, recomputed at most once per minute."""
+    global _last_minute
+    minute = int(time.time() // 60)
+    cached = _last_minute
+    if minute != cached[0]:
+        cached = (minute, datetime.now(LOCAL_TZ).strftime("%H:%M"))
+        _last_minute = cached
+    return cached[1]
+
+# Per-user in-memory state is bounded so a long-running bot does not grow without limit.
+_PROFILE_CACHE_MAXSIZE = 10_000
+MAX_CACHED_MEALS = 20
+
+class _LRUDict(OrderedDict):
+    """Dict that evicts its least recently used entry once it holds more than maxsize keys."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            self.move_to_end(key)
+        except KeyError:
+            return default
+        return super().get(key, default)
+
+def _append_meal(profile: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Append a meal to a cached profile, keeping only the newest MAX_CACHED_MEALS."""
+    meals = profile.setdefault("meals", [])
+    meals.append(record)
+    if len(meals) > MAX_CACHED_MEALS:
+        del meals[:-MAX_CACHED_MEALS]
+
+# Meal records whose queued Supabase insert has not finished yet (id(record) -> future)
+_pending_meal_writes: Dict[int, "asyncio.Future[None]"] = {}
+
+def _track_meal_write(record: Dict[str, Any]) -> None:
+    """Mark a meal record as queued for insertion (call from the event loop)."""
+    _pending_meal_writes[id(record)] = asyncio.get_running_loop().create_future()
+
+def _finish_meal_write(record: Dict[str, Any]) -> None:
+    """Release anyone waiting on a queued insert, whether or not it succeeded."""
+    future = _pending_meal_writes.pop(id(record), None)
+    if future is not None and not future.done():
+        future.set_result(None)
+
+def _meal_write_pending(record: Optional[Dict[str, Any]]) -> bool:
+    return record is not None and id(record) in _pending_meal_writes
+
+async def wait_meal_persisted(record: Optional[Dict[str, Any]]) -> None:
+    """Wait for a queued insert of `record` (if any) so its meal_id is final."""
+    future = _pending_meal_writes.get(id(record)) if record is not None else None
+    if future is not None:
+        await asyncio.shield(future)
+
 # State (Moved from bot.py for decoupling)
 demo_mode = False
 demo_user_id = None
 demo_guild_id = None
 
 # Temporary demo user profile (in-memory only, cleared on exit)
-_demo_user_profile: Dict[str, Any] = {}  # user_id -> temporary profile JSON
+_demo_user_profile: Dict[str, Any] = _LRUDict(_PROFILE_CACHE_MAXSIZE)  # user_id -> temporary profile JSON
 
 # Supabase Profile Database
 profile_db: Optional[ProfileDB] = None
 
-# In-memory cache for user profiles (synced with Supabase)
-_user_profiles_cache: Dict[str, Dict[str, Any]] = {}  # user_id -> profile
+# In-memory cache for user profiles (synced with Supabase).
+# Touch it only through single dict operations (get/setdefault/pop/assignment) so a
+# reader running in a worker thread never sees a key vanish between check and index.
+_user_profiles_cache: Dict[str, Dict[str, Any]] = _LRUDict(_PROFILE_CACHE_MAXSIZE)  # user_id -> profile
 
 def set_profile_db(db: ProfileDB):
     global profile_db
     profile_db = db
 
+def _as_list(value: Any) -> List[str]:
+    """Read a list column that may be a native array or legacy ", "-joined text."""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    return value.split(", ")
+
+def _profile_from_row(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Supabase profiles row back to the internal profile format."""
+    return {
+        "name": profile.get("full_name", ""),
+        "age": profile.get("age", 25),
+        "gender": profile.get("gender", "Not specified"),
+        "height": profile.get("height_cm", 170),
+        "weight": profile.get("weight_kg", 70),
+        "goal": profile.get("goal", "General Health"),
+        "conditions": _as_list(profile.get("restrictions")),
+        "activity": profile.get("activity", "Moderately Active"),
+        "diet": _as_list(profile.get("diet")),
+        "preferences": profile.get("preferences_json") or {},
+        "meals": []
+    }
+
 def get_user_profile(user_id: str) -> Dict[str, Any]:
     """Get user profile from cache or load from Supabase."""
     global _user_profiles_cache, profile_db
 
-    if user_id in _user_profiles_cache:
-        return _user_profiles_cache[user_id]
+    cached = _user_profiles_cache.get(user_id)
+    if cached is not None:
+        return cached
 
     # Try to load from Supabase
     if profile_db:
         profile = profile_db.get_profile(user_id)
         if profile:
-            # Convert Supabase format back to internal format
-            _user_profiles_cache[user_id] = {
-                "name": profile.get("full_name", ""),
-                "age": profile.get("age", 25),
-                "gender": profile.get("gender", "Not specified"),
-                "height": profile.get("height_cm", 170),
-                "weight": profile.get("weight_kg", 70),
-                "goal": profile.get("goal", "General Health"),
-                "conditions": profile.get("restrictions", "").split(", ") if profile.get("restrictions") else [],
-                "activity": profile.get("activity", "Moderately Active"),
-                "diet": profile.get("diet", []).split(", ") if profile.get("diet") else [],
-                "preferences": profile.get("preferences_json") or {},
-                "meals": []
-            }
-            return _user_profiles_cache[user_id]
+            return _user_profiles_cache.setdefault(user_id, _profile_from_row(profile))
 
     # Return empty default if not found
     return {"meals": []}
 
+async def get_user_profile_async(user_id: str) -> Dict[str, Any]:
+    """Async variant of get_user_profile; cache misses query Supabase off the event loop."""
+    cached = _user_profiles_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    if profile_db:
+        try:
+            profile = await asyncio.to_thread(profile_db.get_profile, user_id)
+        except Exception as e:
+            logger.warning("Failed to load profile for %s: %s", user_id, e)
+            profile = None
+        if profile:
+            # A save may have landed while we were waiting; keep the newer entry.
+            return _user_profiles_cache.setdefault(user_id, _profile_from_row(profile))
+
+    return {"meals": []}
+
 def save_user_profile(user_id: str, profile: Dict[str, Any]) -> bool:
     """Save user profile to Supabase."""
     global profile_db, _user_profiles_cache
@@ -147,49 +249,49 @@ def save_user_profile(user_id: str, profile: Dict[str, Any]) -> bool:
 
         # Update cache
         _user_profiles_cache[user_id] = normalized_profile
-        logger.info(f"✅ Profile saved for user {user_id}")
+        logger.info("✅ Profile saved for user %s", user_id)
         return True
 
     except Exception as e:
-        logger.error(f"❌ Failed to save profile: {e}")
+        logger.error("❌ Failed to save profile: %s", e)
         return False
 
+# Mifflin-St Jeor activity multipliers (unknown levels fall back to sedentary)
+_ACTIVITY_FACTORS: Dict[str, float] = {
+    "sedentary": 1.2,
+    "lightly active": 1.375,
+    "moderately active": 1.55,
+    "very active": 1.725,
+    "extra active": 1.9
+}
+
+def _calc_tdee(weight: float, height: float, age: int, is_female: bool, factor: float, goal: str) -> int:
+    """Pure arithmetic core of calculate_daily_target."""
+    # BMR
+    bmr = (10 * weight) + (6.25 * height) - (5 * age) + (-161 if is_female else 5)
+    tdee = bmr * factor
+
+    # Goal adjustment
+    if 'lose' in goal:
+        tdee -= 500
+    elif 'gain' in goal:
+        tdee += 300
+
+    return int(tdee)
+
 def calculate_daily_target(profile: Dict[str, Any]) -> int:
     """Calculate TDEE based on Mifflin-St Jeor Equation."""
     try:
-        weight = float(profile.get('weight_kg', 70))
-        height = float(profile.get('height_cm', 170))
-        age = int(profile.get('age', 30))
-        gender = profile.get('gender', 'Male').lower()
-        
-        # BMR
-        bmr = (10 * weight) + (6.25 * height) - (5 * age)
-        if 'female' in gender:
-            bmr -= 161
-        else:
-            bmr += 5
-        
-        # Activity Factor
-        activity_map = {
-            "sedentary": 1.2,
-            "lightly active": 1.375,
-            "moderately active": 1.55,
-            "very active": 1.725,
-            "extra active": 1.9
-        }
-        factor = activity_map.get(profile.get('activity', '').lower(), 1.2)
-        tdee = bmr * factor
-        
-        # Goal adjustment
-        goal = profile.get('goal', '').lower()
-        if 'lose' in goal:
-            tdee -= 500
-        elif 'gain' in goal:
-            tdee += 300
-            
-        return int(tdee)
+        return _calc_tdee(
+            weight=float(profile.get('weight_kg', 70)),
+            height=float(profile.get('height_cm', 170)),
+            age=int(profile.get('age', 30)),
+            is_female='female' in profile.get('gender', 'Male').lower(),
+            factor=_ACTIVITY_FACTORS.get(profile.get('activity', '').lower(), 1.2),
+            goal=profile.get('goal', '').lower(),
+        )
     except Exception as e:
-        logger.warning(f"Failed to calculate TDEE: {e}")
+        logger.warning("Failed to calculate TDEE: %s", e)
         return 2000
 
 def _normalize_gender(gender_raw: str) -> str:
@@ -71,7 +71,6 @@ class OnboardingGreetingView(ui.View):
     @ui.button(label='Start Setup', style=discord.ButtonStyle.green, emoji='🚀')
     async def enter_onboarding(self, interaction: discord.Interaction, button: ui.Button):
         # Reveal the full Premium Welcome Embed
-        from src.discord_bot.views import OnboardingStartView
         embed = self.embed_factory.build_welcome_embed(interaction.user.display_name)
         view = OnboardingStartView(
             on_registration_submit=self.on_registration_submit,
@@ -149,6 +148,8 @@ class NewUserGuideView(ui.View):
         await interaction.response.send_message(info_text, ephemeral=True)
 
 class StartSetupView(discord.ui.View):
+    __slots__ = ("on_submit_callback",)
+
     def __init__(self, on_submit_callback):
         super().__init__(timeout=None)
         self.on_submit_callback = on_submit_callback
@@ -200,15 +201,57 @@ class OnboardingStartView(ui.View):
         )
         await interaction.response.send_message(info_text, ephemeral=True)
 
+# Registration select options are built once and shared; each Select gets its own list copy.
+_SEX_OPTIONS = (
+    discord.SelectOption(label="Male", emoji="👨", value="male"),
+    discord.SelectOption(label="Female", emoji="👩", value="female"),
+    discord.SelectOption(label="Other / Prefer not to say", emoji="👤", value="other"),
+)
+_GOAL_OPTIONS = (
+    discord.SelectOption(label="Lose Weight", description="Calorie deficit focus", emoji="📉", value="lose"),
+    discord.SelectOption(label="Gain Muscle", description="Calorie surplus/protein focus", emoji="📈", value="gain"),
+    discord.SelectOption(label="Maintenance", description="Balanced nutrition focus", emoji="⚖️", value="maintain"),
+    discord.SelectOption(label="General Health", description="Overall wellness", emoji="🧘", value="general"),
+)
+_ACTIVITY_OPTIONS = (
+    discord.SelectOption(label="Sedentary", description="Desk job, little exercise", emoji="🪑", value="sedentary"),
+    discord.SelectOption(label="Lightly Active", description="1-3 days/week exercise", emoji="🚶", value="lightly active"),
+    discord.SelectOption(label="Moderately Active", description="3-5 days/week exercise", emoji="🏃", value="moderately active"),
+    discord.SelectOption(label="Very Active", description="6-7 days/week exercise", emoji="🏋️", value="very active"),
+)
+_ALLERGY_OPTIONS = (
+    discord.SelectOption(label="Nuts", emoji="🥜", value="Nuts"),
+    discord.SelectOption(label="Seafood", emoji="🍤", value="Seafood"),
+    discord.SelectOption(label="Dairy", emoji="🥛", value="Dairy"),
+    discord.SelectOption(label="Gluten", emoji="🌾", value="Gluten"),
+    discord.SelectOption(label="Soy", emoji="🫘", value="Soy"),
+    discord.SelectOption(label="Eggs", emoji="🥚", value="Eggs"),
+    discord.SelectOption(label="Sesame", emoji="🥯", value="Sesame"),
+    discord.SelectOption(label="Other (Manual Entry)", emoji="➕", value="Other"),
+)
+_CONDITION_OPTIONS = (
+    discord.SelectOption(label="No Conditions", emoji="✅", value="None"),
+    discord.SelectOption(label="Hypertension", emoji="💓", value="Hypertension"),
+    discord.SelectOption(label="Diabetes", emoji="🩸", value="Diabetes"),
+    discord.SelectOption(label="Knee Injury / Pain", emoji="🦵", value="Knee Injury"),
+    discord.SelectOption(label="Lower Back Pain", emoji="🔙", value="Lower Back Pain"),
+    discord.SelectOption(label="Other Chronic Issue (Manual Entry)", emoji="➕", value="Other"),
+)
+
 class RegistrationViewA(ui.View):
     """
     Step 2/3: Biological Profile & Goals (v4.1 Mobile Optimized).
     Collects Sex, Goal, and Activity Level to calculate TDEE.
     """
+    __slots__ = (
+        "user_id", "profile_buffer", "embed_factory",
+        "selected_sex", "selected_goal", "selected_activity",
+    )
+
     def __init__(self, user_id: str, profile_buffer: Dict[str, Any], embed_factory):
         super().__init__(timeout=600)
         self.user_id = user_id
-        self.profile_buffer = profile_buffer # Reference to _demo_user_profile[user_id]
+        self.profile_buffer = profile_buffer # Per-session buffer, committed in RegistrationViewB
         self.embed_factory = embed_factory
         
         # Internal state to track selections before showing 'Next'
@@ -218,11 +261,7 @@ class RegistrationViewA(ui.View):
 
     @ui.select(
         placeholder="Select Biological Sex (for BMR calculation)...",
-        options=[
-            discord.SelectOption(label="Male", emoji="👨", value="male"),
-            discord.SelectOption(label="Female", emoji="👩", value="female"),
-            discord.SelectOption(label="Other / Prefer not to say", emoji="👤", value="other"),
-        ],
+        options=list(_SEX_OPTIONS),
         custom_id="reg_sex"
     )
     async def select_sex(self, interaction: discord.Interaction, select: ui.Select):
@@ -234,12 +273,7 @@ class RegistrationViewA(ui.View):
 
     @ui.select(
         placeholder="Select Primary Health Goal...",
-        options=[
-            discord.SelectOption(label="Lose Weight", description="Calorie deficit focus", emoji="📉", value="lose"),
-            discord.SelectOption(label="Gain Muscle", description="Calorie surplus/protein focus", emoji="📈", value="gain"),
-            discord.SelectOption(label="Maintenance", description="Balanced nutrition focus", emoji="⚖️", value="maintain"),
-            discord.SelectOption(label="General Health", description="Overall wellness", emoji="🧘", value="general"),
-        ],
+        options=list(_GOAL_OPTIONS),
         custom_id="reg_goal"
     )
     async def select_goal(self, interaction: discord.Interaction, select: ui.Select):
@@ -251,12 +285,7 @@ class RegistrationViewA(ui.View):
 
     @ui.select(
         placeholder="Select Activity Level...",
-        options=[
-            discord.SelectOption(label="Sedentary", description="Desk job, little exercise", emoji="🪑", value="sedentary"),
-            discord.SelectOption(label="Lightly Active", description="1-3 days/week exercise", emoji="🚶", value="lightly active"),
-            discord.SelectOption(label="Moderately Active", description="3-5 days/week exercise", emoji="🏃", value="moderately active"),
-            discord.SelectOption(label="Very Active", description="6-7 days/week exercise", emoji="🏋️", value="very active"),
-        ],
+        options=list(_ACTIVITY_OPTIONS),
         custom_id="reg_activity"
     )
     async def select_activity(self, interaction: discord.Interaction, select: ui.Select):
@@ -290,39 +319,22 @@ class RegistrationViewA(ui.View):
 
         try:
             # Update buffer
-            self.profile_buffer["gender"] = self.selected_sex
-            self.profile_buffer["goal"] = self.selected_goal
-            self.profile_buffer["activity"] = self.selected_activity
-            
-            # Calculate TDEE (Mifflin-St Jeor)
-            # Reusing the logic identified in bot.py
-            weight = float(self.profile_buffer.get('weight_kg', 70))
-            height = float(self.profile_buffer.get('height_cm', 170))
-            age = int(self.profile_buffer.get('age', 30))
+            buf = self.profile_buffer
+            buf["gender"] = self.selected_sex
+            buf["goal"] = self.selected_goal
+            buf["activity"] = self.selected_activity
             
-            bmr = (10 * weight) + (6.25 * height) - (5 * age)
-            if self.selected_sex == 'female':
-                bmr -= 161
-            else:
-                bmr += 5 # Default to male/other for safety calculation
-            
-            activity_map = {
-                "sedentary": 1.2,
-                "lightly active": 1.375,
-                "moderately active": 1.55,
-                "very active": 1.725
-            }
-            factor = activity_map.get(self.selected_activity, 1.2)
-            tdee = bmr * factor
-            
-            # Goal adjustment
-            if 'lose' in self.selected_goal:
-                tdee -= 500
-            elif 'gain' in self.selected_goal:
-                tdee += 300
-                
-            self.profile_buffer["tdee"] = int(tdee)
-            logger.info(f"Calculated TDEE for {self.user_id}: {int(tdee)} kcal")
+            # Calculate TDEE (Mifflin-St Jeor), shared with profile_utils.calculate_daily_target
+            tdee = pu._calc_tdee(
+                weight=float(buf.get('weight_kg', 70)),
+                height=float(buf.get('height_cm', 170)),
+                age=int(buf.get('age', 30)),
+                is_female=self.selected_sex == 'female',  # male/other use the male constant for safety
+                factor=pu._ACTIVITY_FACTORS.get(self.selected_activity, 1.2),
+                goal=self.selected_goal,
+            )
+            buf["tdee"] = tdee
+            logger.info("Calculated TDEE for %s: %s kcal", self.user_id, int(tdee))
 
             # Transition to Step 3/3
             embed = self.embed_factory.build_progress_embed(
@@ -342,7 +354,7 @@ class RegistrationViewA(ui.View):
             )
 
         except Exception as e:
-            logger.error(f"Error in RegistrationViewA calculation: {e}")
+            logger.error("Error in RegistrationViewA calculation: %s", e)
             await interaction.response.send_message("⚠️ Failed to calibrate profile. Please try again.", ephemeral=True)
 
 class AllergyModal(ui.Modal, title='Manual Allergy Entry'):
@@ -384,6 +396,11 @@ class RegistrationViewB(ui.View):
     Step 3/3: Safety & Allergies (v4.1).
     Collects Allergies and Health Conditions, then persists to Supabase.
     """
+    __slots__ = (
+        "user_id", "profile_buffer", "embed_factory",
+        "selected_allergies", "selected_conditions",
+    )
+
     def __init__(self, user_id: str, profile_buffer: Dict[str, Any], embed_factory):
         super().__init__(timeout=600)
         self.user_id = user_id
@@ -397,16 +414,7 @@ class RegistrationViewB(ui.View):
         placeholder="Select Allergies (Multi-select)...",
         min_values=0,
         max_values=8,
-        options=[
-            discord.SelectOption(label="Nuts", emoji="🥜", value="Nuts"),
-            discord.SelectOption(label="Seafood", emoji="🍤", value="Seafood"),
-            discord.SelectOption(label="Dairy", emoji="🥛", value="Dairy"),
-            discord.SelectOption(label="Gluten", emoji="🌾", value="Gluten"),
-            discord.SelectOption(label="Soy", emoji="🫘", value="Soy"),
-            discord.SelectOption(label="Eggs", emoji="🥚", value="Eggs"),
-            discord.SelectOption(label="Sesame", emoji="🥯", value="Sesame"),
-            discord.SelectOption(label="Other (Manual Entry)", emoji="➕", value="Other"),
-        ],
+        options=list(_ALLERGY_OPTIONS),
         custom_id="reg_allergies"
     )
     async def select_allergies(self, interaction: discord.Interaction, select: ui.Select):
@@ -419,14 +427,7 @@ class RegistrationViewB(ui.View):
         placeholder="Select Chronic Conditions & Injuries...",
         min_values=0,
         max_values=5,
-        options=[
-            discord.SelectOption(label="No Conditions", emoji="✅", value="None"),
-            discord.SelectOption(label="Hypertension", emoji="💓", value="Hypertension"),
-            discord.SelectOption(label="Diabetes", emoji="🩸", value="Diabetes"),
-            discord.SelectOption(label="Knee Injury / Pain", emoji="🦵", value="Knee Injury"),
-            discord.SelectOption(label="Lower Back Pain", emoji="🔙", value="Lower Back Pain"),
-            discord.SelectOption(label="Other Chronic Issue (Manual Entry)", emoji="➕", value="Other"),
-        ],
+        options=list(_CONDITION_OPTIONS),
         custom_id="reg_conditions"
     )
     async def select_conditions(self, interaction: discord.Interaction, select: ui.Select):
@@ -475,20 +476,21 @@ class RegistrationViewB(ui.View):
             conditions = [c for c in self.selected_conditions if c != "None"]
             
             # Combine everything into profile_buffer
-            self.profile_buffer["conditions"] = conditions
-            self.profile_buffer["diet"] = self.selected_allergies # Mapping allergies to 'diet' for consistency with schema
+            buf = self.profile_buffer
+            buf["conditions"] = conditions
+            buf["diet"] = self.selected_allergies # Mapping allergies to 'diet' for consistency with schema
             
             # Add onboarding metadata
-            prefs = self.profile_buffer.get("preferences_json", {})
+            prefs = buf.get("preferences_json", {})
             prefs["onboarding_completed"] = True
             prefs["registration_date"] = datetime.now().isoformat()
-            self.profile_buffer["preferences_json"] = prefs
+            buf["preferences_json"] = prefs
 
             # BMI Calculation: weight / (height/100)^2
-            h_m = float(self.profile_buffer["height_cm"]) / 100
-            w_kg = float(self.profile_buffer["weight_kg"])
+            h_m = float(buf["height_cm"]) / 100
+            w_kg = float(buf["weight_kg"])
             bmi = w_kg / (h_m * h_m)
-            self.profile_buffer["bmi"] = round(bmi, 1)
+            buf["bmi"] = round(bmi, 1)
 
             # SAVE TO SUPABASE
             from src.discord_bot.profile_db import get_profile_db
@@ -497,27 +499,30 @@ class RegistrationViewB(ui.View):
             # Use create_profile for new registrations
             db.create_profile(
                 discord_user_id=self.user_id,
-                full_name=self.profile_buffer["name"],
-                age=int(self.profile_buffer["age"]),
-                gender=self.profile_buffer["gender"],
-                height_cm=float(self.profile_buffer["height_cm"]),
-                weight_kg=float(self.profile_buffer["weight_kg"]),
-                goal=self.profile_buffer["goal"],
+                full_name=buf["name"],
+                age=int(buf["age"]),
+                gender=buf["gender"],
+                height_cm=float(buf["height_cm"]),
+                weight_kg=float(buf["weight_kg"]),
+                goal=buf["goal"],
                 conditions=conditions,
-                activity=self.profile_buffer["activity"],
+                activity=buf["activity"],
                 diet=self.selected_allergies,
-                preferences=self.profile_buffer["preferences_json"]
+                preferences=buf["preferences_json"]
             )
 
+            # Commit the completed onboarding buffer only after a successful save.
+            pu._demo_user_profile[self.user_id] = buf
+
             # Build Welcome Embed
             embed = discord.Embed(
                 title="✨ Welcome to Health Butler AI v7.0!",
                 description=(
-                    f"Congratulations **{self.profile_buffer['name']}**! Your personalized health profile is now active.\n\n"
+                    f"Congratulations **{buf['name']}**! Your personalized health profile is now active.\n\n"
                     f"**Your Stats Summary:**\n"
-                    f"• BMI: **{self.profile_buffer['bmi']}**\n"
-                    f"• Daily Target: **{self.profile_buffer.get('tdee', 2000)} kcal**\n"
-                    f"• Health Goal: **{self.profile_buffer['goal'].title()}**\n"
+                    f"• BMI: **{buf['bmi']}**\n"
+                    f"• Daily Target: **{buf.get('tdee', 2000)} kcal**\n"
+                    f"• Health Goal: **{buf['goal'].title()}**\n"
                     f"• Safety Tags: {', '.join(self.selected_allergies) or 'None'}\n\n"
                     "🔒 **Privacy Tip**: For maximum safety, I suggest we continue our conversation in **Direct Messages (DMs)** or a **Private Thread**. Your health data is your own!"
                 ),
@@ -537,7 +542,7 @@ class RegistrationViewB(ui.View):
             await self._create_private_health_channel(interaction)
 
         except Exception as e:
-            logger.error(f"Persistence error: {e}")
+            logger.error("Persistence error: %s", e)
             if not interaction.response.is_done():
                 await interaction.response.send_message("⚠️ Error saving profile. Please contact support.", ephemeral=True)
             else:
@@ -563,7 +568,7 @@ class RegistrationViewB(ui.View):
             # Check if channel already exists
             existing = discord.utils.get(guild.text_channels, name=channel_name)
             if existing:
-                logger.info(f"Private channel already exists for user {user.id}")
+                logger.info("Private channel already exists for user %s", user.id)
                 await existing.send(
                     f"👋 Welcome back, **{user.display_name}**! "
                     f"Your profile has been updated. Ready to log your health journey!"
@@ -587,7 +592,7 @@ class RegistrationViewB(ui.View):
                         reason="Category for private health logging channels"
                     )
                 except Exception as cat_err:
-                    logger.warning(f"Could not create category: {cat_err}")
+                    logger.warning("Could not create category: %s", cat_err)
                     category = None
 
 
@@ -602,7 +607,7 @@ class RegistrationViewB(ui.View):
             )
 
 
-            logger.info(f"Created private channel {private_channel.name} for user {user.id}")
+            logger.info("Created private channel %s for user %s", private_channel.name, user.id)
 
 
             # Send welcome message to private channel
@@ -652,7 +657,7 @@ class RegistrationViewB(ui.View):
             db.update_profile(self.user_id, preferences_json=prefs)
 
 
-            logger.info(f"[Onboarding] Stored private channel ID for user {self.user_id}")
+            logger.info("[Onboarding] Stored private channel ID for user %s", self.user_id)
 
 
             # Notify user in the original channel
@@ -668,7 +673,7 @@ class RegistrationViewB(ui.View):
                 ephemeral=True
             )
         except Exception as e:
-            logger.error(f"Error creating private channel: {e}")
+            logger.error("Error creating private channel: %s", e)
             await interaction.followup.send(
                 "⚠️ Could not create private channel, but your profile is saved! "
                 "Use DMs for private health logging.",
@@ -744,7 +749,7 @@ class LogWorkoutView(ui.View):
                 source="fitness_button"
             )
         except Exception as e:
-            logger.warning(f"Workout persistence failed: {e}")
+            logger.warning("Workout persistence failed: %s", e)
 
         # Respond with standard confirmation + Handoff Suggestion
         embed = discord.Embed(
@@ -787,7 +792,7 @@ class LogWorkoutView(ui.View):
             )
             await interaction.response.send_message(msg, ephemeral=True)
         except Exception as e:
-            logger.warning(f"Failed to fetch progress: {e}")
+            logger.warning("Failed to fetch progress: %s", e)
             await interaction.response.send_message("⚠️ Could not load progress.", ephemeral=True)
 
     @ui.button(label='Safety Info', style=discord.ButtonStyle.red, emoji='🛡️')
@@ -913,7 +918,7 @@ class OverTargetPromptView(discord.ui.View):
             await interaction.message.edit(view=self)
             
         except Exception as e:
-            logger.error(f"Error in OverTargetPrompt: {e}")
+            logger.error("Error in OverTargetPrompt: %s", e)
             await interaction.followup.send("❌ Error fetching workout plan. Try again later.", ephemeral=True)
 
     @discord.ui.button(label="No thanks", style=discord.ButtonStyle.gray, emoji="🚫")
@@ -959,7 +964,7 @@ class MealLogView(discord.ui.View):
             pass
 
     def _is_logged(self) -> bool:
-        return bool(self.logged_meal and self.logged_meal.get("meal_id"))
+        return bool(self.logged_meal and (self.logged_meal.get("meal_id") or pu._meal_write_pending(self.logged_meal)))
 
     async def _refresh_message_embed(self, interaction: discord.Interaction) -> None:
         embed = self.bot._build_nutrition_embed(self.nutrition_payload)
@@ -973,6 +978,8 @@ class MealLogView(discord.ui.View):
 
     async def apply_multiplier(self, interaction: discord.Interaction, multiplier: float, *, dish_override: Optional[str] = None) -> None:
         _apply_serving_multiplier(self.nutrition_payload, multiplier, dish_override=dish_override)
+        from src.discord_bot import profile_utils as pu
+        await pu.wait_meal_persisted(self.logged_meal)
         meal_id = str((self.logged_meal or {}).get("meal_id") or "")
 
         if self._is_logged():
@@ -1013,9 +1020,8 @@ class MealLogView(discord.ui.View):
 
     def _build_meal_record(self) -> Dict[str, Any]:
         macros = self.nutrition_payload.get("total_macros", {}) or {}
-        from src.discord_bot.profile_utils import LOCAL_TZ
         return {
-            "time": datetime.now(LOCAL_TZ).strftime("%H:%M"),
+            "time": pu._now_hhmm(),
             "dish": self.nutrition_payload.get("dish_name", "Meal"),
             "macros": {
                 "calories": float(macros.get("calories", 0) or 0),
@@ -1027,25 +1033,26 @@ class MealLogView(discord.ui.View):
 
     def _cache_add(self, record: Dict[str, Any]) -> None:
         try:
-            from src.discord_bot.profile_utils import _user_profiles_cache
-            if self.user_id in _user_profiles_cache:
-                _user_profiles_cache[self.user_id].setdefault("meals", []).append(
+            cached = pu._user_profiles_cache.get(self.user_id)
+            if cached is not None:
+                pu._append_meal(
+                    cached,
                     {
                         "meal_id": record.get("meal_id"),
                         "time": record.get("time"),
                         "dish": record.get("dish"),
                         "macros": record.get("macros"),
-                    }
+                    },
                 )
         except Exception:
             pass
 
     def _cache_remove(self, meal_id: str) -> None:
         try:
-            from src.discord_bot.profile_utils import _user_profiles_cache
-            if self.user_id in _user_profiles_cache:
-                meals = _user_profiles_cache[self.user_id].get("meals", []) or []
-                _user_profiles_cache[self.user_id]["meals"] = [m for m in meals if str(m.get("meal_id")) != str(meal_id)]
+            cached = pu._user_profiles_cache.get(self.user_id)
+            if cached is not None:
+                meals = cached.get("meals", []) or []
+                cached["meals"] = [m for m in meals if str(m.get("meal_id")) != str(meal_id)]
         except Exception:
             pass
 
@@ -1062,12 +1069,14 @@ class MealLogView(discord.ui.View):
 
         if pu.demo_mode and str(self.user_id) == str(pu.demo_user_id):
             record["meal_id"] = f"demo-{uuid.uuid4().hex[:10]}"
-            pu._demo_user_profile.setdefault(self.user_id, {"meals": []}).setdefault("meals", []).append(record)
+            pu._append_meal(pu._demo_user_profile.setdefault(self.user_id, {"meals": []}), record)
             self.logged_meal = record
         elif pu.profile_db:
             try:
-                created = pu.profile_db.create_meal(
+                from datetime import date
+                created = pu.profile_db.persist_meal(
                     discord_user_id=self.user_id,
+                    log_date=date.today(),
                     dish_name=record["dish"],
                     calories=record["macros"]["calories"],
                     protein_g=record["macros"]["protein"],
@@ -1078,8 +1087,6 @@ class MealLogView(discord.ui.View):
                 meal_id = (created or {}).get("id")
                 record["meal_id"] = meal_id or f"db-unknown-{uuid.uuid4().hex[:10]}"
                 self.logged_meal = record
-                from datetime import date
-                pu.profile_db.recompute_daily_log_from_meals(self.user_id, date.today())
             except Exception as exc:
                 return await interaction.response.send_message(f"Failed to log meal: {exc}", ephemeral=True)
         else:
@@ -1105,7 +1112,7 @@ class MealLogView(discord.ui.View):
                     view=OverTargetPromptView(self.bot, self.user_id, self.nutrition_payload)
                 )
         except Exception as e:
-            logger.error(f"Error checking over-target during add_to_today: {e}")
+            logger.error("Error checking over-target during add_to_today: %s", e)
 
     @discord.ui.button(label="Adjust Serving", style=discord.ButtonStyle.gray, emoji="✏️")
     async def adjust_serving(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -1121,12 +1128,16 @@ class MealLogView(discord.ui.View):
         if not self._is_logged():
             return await interaction.response.send_message("This scan isn't logged yet.", ephemeral=True)
 
-        meal_id = str(self.logged_meal.get("meal_id"))
         from src.discord_bot import profile_utils as pu
+        await pu.wait_meal_persisted(self.logged_meal)
+        if not self._is_logged():
+            return await interaction.response.send_message("This scan failed to save, so there is nothing to remove.", ephemeral=True)
+        meal_id = str(self.logged_meal.get("meal_id"))
 
         if pu.demo_mode and str(self.user_id) == str(pu.demo_user_id):
-            meals = pu._demo_user_profile.get(self.user_id, {}).get("meals", []) or []
-            pu._demo_user_profile[self.user_id]["meals"] = [m for m in meals if str(m.get("meal_id")) != meal_id]
+            demo = pu._demo_user_profile.get(self.user_id)
+            if demo is not None:
+                demo["meals"] = [m for m in demo.get("meals", []) or [] if str(m.get("meal_id")) != meal_id]
         elif pu.profile_db:
             try:
                 pu.profile_db.delete_meal(meal_id)
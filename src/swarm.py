@@ -6,9 +6,10 @@ Wraps specialized agents (Fitness, Nutrition) into a unified interface.
 import logging
 import json
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from src.agents.base_agent import run_llm_blocking
 from src.agents.router_agent import RouterAgent
-from src.data_rag.simple_rag_tool import SimpleRagTool
+from src.data_rag.simple_rag_tool import get_rag_tool
 
 logger = logging.getLogger(__name__)
 
@@ -24,26 +25,72 @@ class HealthSwarm:
     def __init__(self, verbose: bool = True):
         self.verbose = verbose
         self.router = RouterAgent()
-        self.rag = SimpleRagTool()
+        self.rag = get_rag_tool()
+        # Specialist agents are built on first use and reused across requests.
+        self._nutrition_agent = None
+        self._fitness_agent = None
         logger.info("HealthSwarm initialized with RouterAgent and Swarm Handoff support")
 
+    def _ensure_nutrition_agent(self):
+        if self._nutrition_agent is None:
+            from src.agents.nutrition.nutrition_agent import NutritionAgent
+            agent = NutritionAgent()
+            # warm_up builds on a worker thread; keep whichever instance landed first.
+            if self._nutrition_agent is None:
+                self._nutrition_agent = agent
+        return self._nutrition_agent
+
+    def _ensure_fitness_agent(self):
+        if self._fitness_agent is None:
+            from src.agents.fitness.fitness_agent import FitnessAgent
+            agent = FitnessAgent()
+            if self._fitness_agent is None:
+                self._fitness_agent = agent
+        return self._fitness_agent
+
+    async def warm_up(self) -> None:
+        """Build the specialist agents and prime the RAG tables concurrently so the first request doesn't pay for it."""
+        try:
+            await asyncio.gather(
+                asyncio.to_thread(self._ensure_nutrition_agent),
+                asyncio.to_thread(self._ensure_fitness_agent),
+                asyncio.to_thread(self.rag.warmup),
+            )
+            logger.info("HealthSwarm specialist agents warmed up")
+        except Exception as e:
+            logger.warning(f"HealthSwarm warm-up failed; agents will load on first use: {e}")
+
+    def _get_nutrition_agent(self):
+        """Shared NutritionAgent (vision engine, RAG tables and GenAI client load once)."""
+        agent = self._ensure_nutrition_agent()
+        agent.reset_history()
+        return agent
+
+    def _get_fitness_agent(self):
+        """Shared FitnessAgent; user profiles are still re-read on every request."""
+        agent = self._ensure_fitness_agent()
+        agent.reset_history()
+        agent._profile_cache.clear()
+        return agent
+
     async def execute_async(
         self, 
         user_input: str, 
         image_path: Optional[str] = None, 
         user_context: Optional[Dict[str, Any]] = None,
-        progress_callback: Optional[Any] = None
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """
         [Phase 3] High-level async execution with proactive handoffs.
+        An uploaded image may be given either as a file path or as raw bytes.
         """
         lower_input = user_input.lower()
         
         # 1. Check for explicit handoff signals (e.g. from Button interactions)
         if lower_input.startswith("transfer_to_nutrition"):
-            from src.agents.nutrition.nutrition_agent import NutritionAgent
             logger.info("Swarm Handoff: Force Routing to Nutrition")
-            agent = NutritionAgent()
+            agent = self._get_nutrition_agent()
             
             # Extract kcal if present in signal
             kcal_hint = 0
@@ -60,69 +107,183 @@ class HealthSwarm:
             return {"response": response, "agent": "nutrition"}
 
         if lower_input.startswith("transfer_to_fitness"):
-            from src.agents.fitness.fitness_agent import FitnessAgent
             logger.info("Swarm Handoff: Force Routing to Fitness")
-            agent = FitnessAgent()
+            agent = self._get_fitness_agent()
             response = await agent.execute_async(user_input, [{"type": "user_context", "content": json.dumps(user_context or {})}])
             return {"response": response, "agent": "fitness"}
 
-        # 2. Collaborative Delegation via RouterAgent
-        delegations = self.router.analyze_and_delegate(user_input)
+        # 2. Collaborative Delegation via RouterAgent (blocking LLM call, kept off the loop)
+        delegations = await run_llm_blocking(self.router.analyze_and_delegate, user_input)
+        return await self._execute_delegations(delegations, image_path, user_context, progress_callback, image_bytes)
+
+    async def _execute_delegations(
+        self,
+        delegations: List[Dict[str, str]],
+        image_path: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        """Run each routed delegation and combine the results."""
+        results, final_agent = await self._run_delegations(
+            delegations, image_path, user_context, progress_callback, image_bytes
+        )
+
+        # Synthesis: If multiple results, combine them. If one, return as is (for specialized JSON handling)
+        if len(results) == 1:
+            return {"response": results[0], "agent": final_agent}
         
-        results = []
+        # Multi-agent synthesis
+        combined_response = await run_llm_blocking(self.router.synthesize_results, delegations, results)
+        return {"response": combined_response, "agent": "router"}
+
+    async def _run_delegations(
+        self,
+        delegations: List[Dict[str, str]],
+        image_path: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> Tuple[List[str], str]:
+        """Run each routed delegation, returning the raw results and the answering agent.
+
+        Delegations only share the user's context, never each other's output,
+        so different agents run concurrently. Each agent instance (and its
+        conversation history) is shared, so delegations to the same agent run
+        in order within that agent's lane.
+        """
+        # Serialize the user's context once; every delegation shares the same entry.
+        context_entry = {"type": "user_context", "content": json.dumps(user_context or {})}
+
+        lanes: Dict[str, List[int]] = {}
+        for i, delegation in enumerate(delegations):
+            agent = delegation["agent"]
+            lanes.setdefault(agent if agent in self._DELEGATION_HANDLERS else "router", []).append(i)
+        results: List[str] = [""] * len(delegations)
+
+        async def run_lane(indices: List[int]) -> None:
+            for i in indices:
+                results[i] = await self._run_delegation(
+                    delegations[i], context_entry, image_path, progress_callback, image_bytes
+                )
+
+        await asyncio.gather(*(run_lane(indices) for indices in lanes.values()))
+
         final_agent = "router"
-        
         for delegation in delegations:
-            agent_type = delegation["agent"]
-            task = delegation["task"]
+            if delegation["agent"] in ("fitness", "nutrition"):
+                final_agent = delegation["agent"]
+        return results, final_agent
+
+    async def _run_fitness(
+        self,
+        task: str,
+        context_entry: Dict[str, Any],
+        image_path: Optional[str] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> str:
+        agent = self._get_fitness_agent()
+        return await agent.execute_async(task, [context_entry])
+
+    async def _run_nutrition(
+        self,
+        task: str,
+        context_entry: Dict[str, Any],
+        image_path: Optional[str] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> str:
+        agent = self._get_nutrition_agent()
+        context = [context_entry]
+        if image_bytes:
+            context.append({"type": "image_bytes", "content": image_bytes})
+        elif image_path:
+            context.append({"type": "image_path", "content": image_path})
             
-            if agent_type == "fitness":
-                from src.agents.fitness.fitness_agent import FitnessAgent
-                agent = FitnessAgent()
-                context = [{"type": "user_context", "content": json.dumps(user_context or {})}]
-                res = await agent.execute_async(task, context)
-                results.append(res)
-                final_agent = "fitness"
+        # Handle image if available for the nutrition part of task
+        res = await agent.execute_async(task, context, progress_callback=progress_callback)
+        
+        # Phase 6: Calorie Balance Shield Checking
+        try:
+            res_json = json.loads(res)
+            cal_pct = res_json.get("daily_value_percentage", {}).get("calories", 0)
+            warnings = [w.lower() for w in res_json.get("visual_warnings", [])]
             
-            elif agent_type == "nutrition":
-                from src.agents.nutrition.nutrition_agent import NutritionAgent
-                agent = NutritionAgent()
-                context = [{"type": "user_context", "content": json.dumps(user_context or {})}]
-                if image_path:
-                    context.append({"type": "image_path", "content": image_path})
-                    
-                # Handle image if available for the nutrition part of task
-                res = await agent.execute_async(task, context, progress_callback=progress_callback)
-                
-                # Phase 6: Calorie Balance Shield Checking
-                try:
-                    res_json = json.loads(res)
-                    cal_pct = res_json.get("daily_value_percentage", {}).get("calories", 0)
-                    warnings = [w.lower() for w in res_json.get("visual_warnings", [])]
-                    
-                    suggest_fitness_transfer = cal_pct > 50.0 or any("fried" in w or "oil" in w or "greasy" in w for w in warnings)
-                    
-                    if suggest_fitness_transfer:
-                        res_json["suggest_fitness_transfer"] = True
-                        res = json.dumps(res_json)
-                except Exception as e:
-                    logger.warning(f"Error checking fitness transfer: {e}")
-
-                results.append(res)
-                final_agent = "nutrition"
+            suggest_fitness_transfer = cal_pct > 50.0 or any("fried" in w or "oil" in w or "greasy" in w for w in warnings)
             
-            else:
-                # Fallback for coder/researcher/etc.
-                res = await asyncio.to_thread(self.router.execute, task)
-                results.append(res)
+            if suggest_fitness_transfer:
+                res_json["suggest_fitness_transfer"] = True
+                res = json.dumps(res_json)
+        except Exception as e:
+            logger.warning(f"Error checking fitness transfer: {e}")
 
-        # Synthesis: If multiple results, combine them. If one, return as is (for specialized JSON handling)
+        return res
+
+    async def _run_general(
+        self,
+        task: str,
+        context_entry: Dict[str, Any],
+        image_path: Optional[str] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> str:
+        # Fallback for coder/researcher/etc.
+        return await run_llm_blocking(self.router.execute, task)
+
+    # Routed agent name -> handler; anything else goes to the router itself.
+    _DELEGATION_HANDLERS = {
+        "fitness": _run_fitness,
+        "nutrition": _run_nutrition,
+    }
+
+    async def _run_delegation(
+        self,
+        delegation: Dict[str, str],
+        context_entry: Dict[str, Any],
+        image_path: Optional[str] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> str:
+        """Execute one routed delegation and return the agent's raw response."""
+        handler = self._DELEGATION_HANDLERS.get(delegation["agent"], HealthSwarm._run_general)
+        return await handler(self, delegation["task"], context_entry, image_path, progress_callback, image_bytes)
+
+    async def execute_stream(
+        self,
+        user_input: str,
+        image_path: Optional[str] = None,
+        user_context: Optional[Dict[str, Any]] = None,
+        progress_callback: Optional[Any] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> AsyncIterator[str]:
+        """
+        Like execute_async, but yields response text as it is generated.
+
+        A single general-purpose delegation and multi-agent synthesis both stream;
+        a lone specialist agent returns JSON that must be parsed whole, so that
+        route yields one complete payload.
+        """
+        lower_input = user_input.lower()
+        if image_path or image_bytes or lower_input.startswith(("transfer_to_nutrition", "transfer_to_fitness")):
+            result = await self.execute_async(user_input, image_path, user_context, progress_callback, image_bytes)
+            yield result["response"]
+            return
+
+        delegations = await run_llm_blocking(self.router.analyze_and_delegate, user_input)
+        if len(delegations) == 1 and delegations[0]["agent"] not in ("fitness", "nutrition"):
+            async for piece in self.router.execute_stream_async(delegations[0]["task"]):
+                yield piece
+            return
+
+        results, _ = await self._run_delegations(delegations, image_path, user_context, progress_callback, image_bytes)
         if len(results) == 1:
-            return {"response": results[0], "agent": final_agent}
-        
-        # Multi-agent synthesis
-        combined_response = self.router.synthesize_results(delegations, results)
-        return {"response": combined_response, "agent": "router"}
+            yield results[0]
+            return
+
+        # Multi-agent synthesis streams, so the first tokens show up before the full report is written.
+        async for piece in self.router.synthesize_results_stream(delegations, results):
+            yield piece
 
     def execute(self, user_input: str, image_path: Optional[str] = None, user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Synchronous wrapper."""
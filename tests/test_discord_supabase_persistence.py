@@ -3,8 +3,9 @@
 import asyncio
 import sys
 import types
+from concurrent.futures import Future
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 
@@ -321,6 +322,38 @@ def test_save_user_profile_update_writes_supported_columns() -> None:
 	assert kwargs["preferences_json"] == {}
 
 
+def test_get_user_profile_async_loads_once_and_caches() -> None:
+	"""Async profile lookup should hit Supabase on a miss and serve later calls from cache."""
+	mock_db = MagicMock()
+	mock_db.get_profile.return_value = {"full_name": "Aziz", "age": 29, "restrictions": "Diabetes"}
+	pu.profile_db = mock_db
+	pu._user_profiles_cache.clear()
+
+	first = asyncio.run(pu.get_user_profile_async("12345"))
+	second = asyncio.run(pu.get_user_profile_async("12345"))
+
+	assert first["name"] == "Aziz"
+	assert first["conditions"] == ["Diabetes"]
+	assert second is first
+	assert mock_db.get_profile.call_count == 1
+
+
+def test_profile_cache_is_bounded_lru() -> None:
+	"""Per-user caches evict the least recently used user and keep only recent meals."""
+	cache = pu._LRUDict(2)
+	cache["a"] = {"meals": []}
+	cache["b"] = {"meals": []}
+	cache.get("a")
+	cache["c"] = {"meals": []}
+	assert list(cache) == ["a", "c"]
+
+	profile = cache["a"]
+	for i in range(pu.MAX_CACHED_MEALS + 5):
+		pu._append_meal(profile, {"meal_id": i})
+	assert len(profile["meals"]) == pu.MAX_CACHED_MEALS
+	assert profile["meals"][0]["meal_id"] == 5
+
+
 def test_persist_chat_message_writes_chat_messages_payload() -> None:
 	"""Chat persistence helper should write user_id/role/content as strings."""
 	mock_db = MagicMock()
@@ -337,6 +370,146 @@ def test_persist_chat_message_writes_chat_messages_payload() -> None:
 	assert isinstance(kwargs["content"], str)
 
 
+def test_stream_swarmed_response_flushes_text_in_discord_sized_chunks() -> None:
+	"""Streamed text replies should be sent in <=1900-char messages as pieces arrive."""
+	mock_db = MagicMock()
+	pu.profile_db = mock_db
+
+	async def _stream(**kwargs):
+		for _ in range(5):
+			yield "x" * 500
+
+	client = discord_bot.HealthButlerDiscordBot.__new__(discord_bot.HealthButlerDiscordBot)
+	client.swarm = SimpleNamespace(execute_stream=_stream)
+	sent = []
+
+	async def _send(content):
+		sent.append(content)
+
+	channel = SimpleNamespace(send=_send)
+	asyncio.run(client._stream_swarmed_response(channel, "hi", "12345"))
+
+	assert [len(chunk) for chunk in sent] == [1900, 600]
+	assert mock_db.save_message.call_args.kwargs["content"] == "x" * 2500
+
+
+def test_send_swarmed_response_skips_json_scan_for_plain_text() -> None:
+	"""Replies without any "{" should go straight to text chunks."""
+	mock_db = MagicMock()
+	pu.profile_db = mock_db
+
+	client = discord_bot.HealthButlerDiscordBot.__new__(discord_bot.HealthButlerDiscordBot)
+	client._extract_json_payload = MagicMock(side_effect=AssertionError("JSON scan should be skipped"))
+	sent = []
+
+	async def _send(content):
+		sent.append(content)
+
+	channel = SimpleNamespace(send=_send)
+	asyncio.run(client._send_swarmed_response(channel, "  " + "y" * 2000 + "\n", "12345"))
+
+	assert [len(chunk) for chunk in sent] == [1900, 100]
+	assert mock_db.save_message.call_args.kwargs["content"] == "y" * 2000
+
+
+def test_status_reply_edits_status_message_then_sends() -> None:
+	"""The first reply replaces the scan status message; later ones are new messages."""
+	edits = []
+	sent = []
+
+	async def _edit(**kwargs):
+		edits.append(kwargs)
+
+	async def _send(content, **kwargs):
+		sent.append(content)
+
+	reply = discord_bot._StatusReply(SimpleNamespace(send=_send), SimpleNamespace(edit=_edit))
+	asyncio.run(reply.send("first"))
+	asyncio.run(reply.send("second"))
+
+	assert edits == [{"content": "first"}]
+	assert sent == ["second"]
+
+
+def test_get_user_fetches_once_then_reuses_cached_user() -> None:
+	"""Proactive DMs should not hit the REST fetch_user endpoint for every send."""
+	client = discord_bot.HealthButlerDiscordBot.__new__(discord_bot.HealthButlerDiscordBot)
+	client._user_cache = {}
+	client.get_user = lambda user_id: None
+	user = SimpleNamespace(id=42)
+	calls = []
+
+	async def _fetch_user(user_id):
+		calls.append(user_id)
+		return user
+
+	client.fetch_user = _fetch_user
+
+	async def _resolve_twice():
+		return await client._get_user(42), await client._get_user(42)
+
+	assert asyncio.run(_resolve_twice()) == (user, user)
+	assert calls == [42]
+
+
+def test_persist_meal_data_returns_before_queued_insert_lands() -> None:
+	"""Scanned meals are queued; meal_id is filled in and waiters released once the insert lands."""
+	insert = Future()
+	mock_db = MagicMock()
+	mock_db.submit_meal.return_value = insert
+	pu.profile_db = mock_db
+	pu.demo_mode = False
+
+	client = discord_bot.HealthButlerDiscordBot.__new__(discord_bot.HealthButlerDiscordBot)
+	payload = {"dish_name": "Ramen", "total_macros": {"calories": 550, "protein": 20, "carbs": 70, "fat": 18}}
+
+	async def _scan():
+		client._meal_writes = set()
+		record = await client._persist_meal_data(payload, "12345")
+		await asyncio.sleep(0)
+		queued = (record["meal_id"], pu._meal_write_pending(record))
+
+		insert.set_result({"id": "m-7"})
+		await pu.wait_meal_persisted(record)
+		return record, queued
+
+	record, queued = asyncio.run(_scan())
+
+	assert queued == (None, True)
+	assert record["meal_id"] == "m-7"
+	assert not pu._meal_write_pending(record)
+	assert mock_db.submit_meal.call_args.kwargs["calories"] == 550.0
+	mock_db.refresh_daily_log.assert_called_once()
+
+
+def test_failed_queued_insert_clears_logged_state_and_notifies_user() -> None:
+	"""A meal whose insert raises is no longer shown as logged and the channel is told."""
+	insert = Future()
+	insert.set_exception(RuntimeError("supabase down"))
+	mock_db = MagicMock()
+	mock_db.submit_meal.return_value = insert
+	pu.profile_db = mock_db
+	pu.demo_mode = False
+
+	client = discord_bot.HealthButlerDiscordBot.__new__(discord_bot.HealthButlerDiscordBot)
+	payload = {"dish_name": "Ramen", "total_macros": {"calories": 550, "protein": 20, "carbs": 70, "fat": 18}}
+	channel = MagicMock()
+	channel.send = AsyncMock()
+
+	async def _scan():
+		client._meal_writes = set()
+		record = await client._persist_meal_data(payload, "12345", notify=channel)
+		await asyncio.gather(*client._meal_writes)
+		return record
+
+	record = asyncio.run(_scan())
+
+	assert record["meal_id"] is None
+	assert not pu._meal_write_pending(record)
+	channel.send.assert_awaited_once()
+	assert "Ramen" in channel.send.await_args.args[0]
+
+
 @pytest.mark.skip(reason="Integration test - requires real database connection")
 def test_persist_meal_data_writes_daily_logs_and_meals_with_numeric_values() -> None:
 	"""Meal persistence should write numeric-compatible values for daily_logs and meals."""
@@ -53,3 +53,15 @@ def test_fitness_with_nutrition_context(mock_base_execute, fitness_agent):
     # Ensure nutrition data was injected into the prompt
     assert "RELEVANT NUTRITION DATA" in called_prompt
     assert "50g protein" in called_prompt
+
+def test_extract_calories_prefers_most_specific_form(fitness_agent):
+    """An explicit total wins over an earlier bare kcal mention."""
+    text = "Snack was 120 kcal. Total Calories: 650 for the day."
+    assert fitness_agent._extract_calories_from_nutrition_info(text) == 650.0
+    assert fitness_agent._extract_calories_from_nutrition_info("about 300 calories") == 300.0
+    assert fitness_agent._extract_calories_from_nutrition_info("no numbers here") is None
+
+def test_extract_discord_id_reads_python_repr_context(fitness_agent):
+    """A str(dict) user_context with apostrophes still yields the user id."""
+    context = [{"type": "user_context", "content": str({"name": "O'Brien", "user_id": 42})}]
+    assert fitness_agent._extract_discord_id(context, "") == "42"
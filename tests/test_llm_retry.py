@@ -0,0 +1,72 @@
+"""Tests for jittered retry of transient LLM failures."""
+
+import asyncio
+
+import pytest
+from google.genai import errors as genai_errors
+
+from src.agents import base_agent
+
+
+def _genai_error(cls, code: int, status: str) -> Exception:
+    return cls(code, {"error": {"code": code, "message": status.lower(), "status": status}})
+
+
+def test_retry_recovers_from_transient_errors(monkeypatch) -> None:
+    """Gemini rate limits and outages are retried with a jittered delay inside the configured bounds."""
+    delays = []
+    monkeypatch.setattr(base_agent.time, "sleep", delays.append)
+    failures = [
+        _genai_error(genai_errors.ClientError, 429, "RESOURCE_EXHAUSTED"),
+        _genai_error(genai_errors.ServerError, 503, "UNAVAILABLE"),
+    ]
+    calls = []
+
+    def _flaky():
+        calls.append(1)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert base_agent.retry_with_exponential_backoff(_flaky) == "ok"
+    assert len(delays) == 2
+    assert all(base_agent.LLM_RETRY_INITIAL_DELAY <= d <= base_agent.LLM_RETRY_MAX_DELAY for d in delays)
+
+
+def test_retry_does_not_repeat_permanent_errors(monkeypatch) -> None:
+    """Client errors such as a bad request fail on the first attempt."""
+    monkeypatch.setattr(base_agent.time, "sleep", lambda _d: pytest.fail("should not sleep"))
+    calls = []
+
+    def _bad_request():
+        calls.append(1)
+        raise ValueError("invalid prompt")
+
+    with pytest.raises(ValueError):
+        base_agent.retry_with_exponential_backoff(_bad_request)
+    assert len(calls) == 1
+
+
+def test_async_retry_sleeps_without_blocking_the_loop(monkeypatch) -> None:
+    """The async variant awaits asyncio.sleep and rebuilds the awaitable per attempt."""
+    delays = []
+
+    async def _sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(base_agent.asyncio, "sleep", _sleep)
+    calls = []
+
+    async def _flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert asyncio.run(base_agent.aretry_with_exponential_backoff(_flaky)) == "ok"
+    assert len(delays) == 1
+
+
+def test_gemini_client_errors_are_not_retried() -> None:
+    """A 400 from Gemini is permanent even though its status is a string."""
+    assert not base_agent._is_transient_error(_genai_error(genai_errors.ClientError, 400, "INVALID_ARGUMENT"))
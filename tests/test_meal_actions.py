@@ -1,4 +1,7 @@
 import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 from unittest.mock import MagicMock
 
@@ -84,3 +87,144 @@ def test_meal_log_view_apply_multiplier_updates_db_when_logged() -> None:
         assert kwargs["fat_g"] == 3.5
     finally:
         pu.profile_db = original_db
+
+
+def test_profile_db_get_profile_serves_repeat_reads_from_cache_until_updated() -> None:
+    db = ProfileDB.__new__(ProfileDB)
+    db._profile_cache = {}
+    db.client = MagicMock()
+    select = db.client.table.return_value.select.return_value.eq.return_value.execute
+    select.return_value = SimpleNamespace(data=[{"id": "42", "full_name": "Ada"}])
+
+    assert db.get_profile("42")["full_name"] == "Ada"
+    assert db.get_profile("42")["full_name"] == "Ada"
+    assert select.call_count == 1
+
+    db.update_profile("42", full_name="Grace")
+    db.get_profile("42")
+    assert select.call_count == 2
+
+
+def test_profile_db_returns_stale_profile_and_refreshes_in_background() -> None:
+    db = ProfileDB.__new__(ProfileDB)
+    db._profile_cache = {"42": ({"id": "42", "full_name": "Ada"}, time.monotonic() - 120)}
+    db._refreshing = set()
+    db._refresh_lock = threading.Lock()
+    db._refresh_pool = ThreadPoolExecutor(max_workers=1)
+    db.client = MagicMock()
+    select = db.client.table.return_value.select.return_value.eq.return_value.execute
+    select.return_value = SimpleNamespace(data=[{"id": "42", "full_name": "Grace"}])
+
+    assert db.get_profile("42")["full_name"] == "Ada"
+    db._refresh_pool.shutdown(wait=True)
+
+    assert select.call_count == 1
+    assert db.get_profile("42")["full_name"] == "Grace"
+
+
+def test_meal_batcher_sends_one_insert_and_maps_rows_back_to_callers() -> None:
+    from concurrent.futures import Future
+    from src.discord_bot.profile_db import _MealInsertBatcher
+
+    client = MagicMock()
+    insert = client.table.return_value.insert
+    insert.return_value.execute.return_value = SimpleNamespace(data=[{"id": 1}, {"id": 2}])
+    batcher = _MealInsertBatcher(client)
+    batch = [({"dish_name": "Soup"}, Future()), ({"dish_name": "Salad"}, Future())]
+
+    batcher._flush(batch)
+
+    insert.assert_called_once_with([{"dish_name": "Soup"}, {"dish_name": "Salad"}])
+    assert [future.result() for _, future in batch] == [{"id": 1}, {"id": 2}]
+
+
+def test_meal_batcher_falls_back_to_table_insert_when_rpc_is_missing(monkeypatch) -> None:
+    from concurrent.futures import Future
+    from src.discord_bot.profile_db import _MealInsertBatcher
+
+    monkeypatch.setenv("SUPABASE_MEALS_ASYNC_COMMIT", "1")
+    client = MagicMock()
+    client.rpc.return_value.execute.side_effect = RuntimeError("function bulk_insert_meals does not exist")
+    client.table.return_value.insert.return_value.execute.return_value = SimpleNamespace(data=[{"id": 1}])
+    batcher = _MealInsertBatcher(client)
+    batch = [({"dish_name": "Soup"}, Future())]
+
+    batcher._flush(batch)
+    batcher._flush([({"dish_name": "Tea"}, Future())])
+
+    assert batch[0][1].result() == {"id": 1}
+    assert client.rpc.call_count == 1
+
+
+def test_create_meal_times_out_and_drops_the_queued_row(monkeypatch) -> None:
+    from concurrent.futures import Future
+    from src.discord_bot import profile_db as profile_db_module
+
+    monkeypatch.setattr(profile_db_module, "MEAL_INSERT_TIMEOUT", 0.01)
+    db = ProfileDB.__new__(ProfileDB)
+    queued = Future()
+    db._meal_batcher = MagicMock()
+    db._meal_batcher.submit.return_value = queued
+
+    try:
+        db.create_meal("42", "Soup", calories=100)
+    except TimeoutError as exc:
+        assert "not confirmed" in str(exc)
+    else:
+        raise AssertionError("create_meal should time out")
+    assert queued.cancelled()
+
+
+def test_get_today_stats_sums_rows_when_rpc_is_missing() -> None:
+    from postgrest.exceptions import APIError
+
+    db = ProfileDB.__new__(ProfileDB)
+    db._stats_rpc_available = True
+    db.client = MagicMock()
+    db.client.rpc.return_value.execute.side_effect = APIError(
+        {"code": "PGRST202", "message": "Could not find the function public.get_today_stats"}
+    )
+    rows = db.client.table.return_value.select.return_value.eq.return_value.gte.return_value.execute
+    rows.return_value = SimpleNamespace(data=[
+        {"calories": 300, "protein_g": 20, "carbs_g": 30, "fat_g": None},
+        {"calories": 200, "protein_g": None, "carbs_g": 10, "fat_g": 5},
+    ])
+
+    stats = db.get_today_stats("42")
+    db.get_today_stats("42")
+
+    assert stats == {"meal_count": 2, "total_calories": 500, "total_protein": 20, "total_carbs": 40, "total_fat": 5}
+    assert db.client.rpc.call_count == 1
+
+
+def test_get_today_stats_keeps_rpc_after_transient_failure() -> None:
+    from postgrest.exceptions import APIError
+
+    db = ProfileDB.__new__(ProfileDB)
+    db._stats_rpc_available = True
+    db.client = MagicMock()
+    db.client.rpc.return_value.execute.side_effect = [
+        APIError({"code": "57014", "message": "canceling statement due to statement timeout"}),
+        SimpleNamespace(data=[{"meal_count": 1, "total_calories": 300.0}]),
+    ]
+    db.client.table.return_value.select.return_value.eq.return_value.gte.return_value.execute.return_value = (
+        SimpleNamespace(data=[{"calories": 300, "protein_g": 20, "carbs_g": 30, "fat_g": 5}])
+    )
+
+    assert db.get_today_stats("42")["total_calories"] == 300
+    assert db.get_today_stats("42") == {"meal_count": 1, "total_calories": 300.0}
+    assert db._stats_rpc_available
+    assert db.client.rpc.call_count == 2
+
+
+def test_get_meals_seeks_past_cursor_when_before_is_given() -> None:
+    db = ProfileDB.__new__(ProfileDB)
+    db.client = MagicMock()
+    query = db.client.table.return_value.select.return_value.eq.return_value
+
+    db.get_meals("42", limit=5)
+    query.lt.assert_not_called()
+
+    db.get_meals("42", limit=5, before="2026-01-02T08:00:00")
+    query.lt.assert_called_once_with("created_at", "2026-01-02T08:00:00")
+    query.lt.return_value.order.return_value.limit.assert_called_once_with(5)
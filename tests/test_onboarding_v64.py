@@ -120,6 +120,25 @@ class TestOnboardingFlow:
         for field in required_fields:
             assert isinstance(field, str)
 
+    def test_registration_submit_keeps_buffer_on_view(self):
+        """Step 1 submit must not write the partial profile into shared module state."""
+        import asyncio
+        from src.discord_bot import commands as cmd
+        from src.discord_bot import profile_utils as pu
+
+        pu._demo_user_profile.pop("4242", None)
+        interaction = MagicMock()
+        interaction.user.id = 4242
+        interaction.response.send_message = AsyncMock()
+        data = {"name": "Tester", "age": 30, "height_cm": 175.0, "weight_kg": 70.0}
+
+        asyncio.run(cmd._on_registration_modal_submit(interaction, data, MagicMock()))
+
+        assert "4242" not in pu._demo_user_profile
+        view = interaction.response.send_message.call_args.kwargs["view"]
+        assert view.profile_buffer["name"] == "Tester"
+        assert view.profile_buffer["age"] == 30
+
     def test_bmi_calculation(self):
         """Test BMI calculation logic used in onboarding."""
         # BMI = weight_kg / (height_m ^ 2)
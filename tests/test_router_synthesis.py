@@ -0,0 +1,67 @@
+"""Tests for RouterAgent result synthesis without an extra model turn."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from src.agents.router_agent import RouterAgent
+
+
+def _router() -> RouterAgent:
+    router = RouterAgent.__new__(RouterAgent)
+    router.execute = MagicMock(return_value="synthesized")
+    return router
+
+
+def test_plain_text_results_are_combined_locally() -> None:
+    router = _router()
+    delegations = [{"agent": "fitness", "task": "legs"}, {"agent": "nutrition", "task": "dinner"}]
+
+    combined = router.synthesize_results(delegations, ["Do squats.", "Eat salmon."])
+
+    assert combined == "**Fitness**: Do squats.\n\n**Nutrition**: Eat salmon."
+    router.execute.assert_not_called()
+
+
+def test_single_successful_result_skips_synthesis() -> None:
+    router = _router()
+    delegations = [{"agent": "fitness", "task": "legs"}, {"agent": "nutrition", "task": "dinner"}]
+
+    combined = router.synthesize_results(delegations, ['{"summary": "ok"}', "[nutrition] Error executing task: 503"])
+
+    assert combined == '{"summary": "ok"}'
+    router.execute.assert_not_called()
+
+
+def test_structured_results_still_use_the_model() -> None:
+    router = _router()
+    delegations = [{"agent": "fitness", "task": "legs"}, {"agent": "nutrition", "task": "dinner"}]
+
+    assert router.synthesize_results(delegations, ['{"a": 1}', '{"b": 2}']) == "synthesized"
+    router.execute.assert_called_once()
+
+
+def test_stream_synthesis_yields_model_tokens_as_they_arrive() -> None:
+    router = _router()
+    delegations = [{"agent": "fitness", "task": "legs"}, {"agent": "nutrition", "task": "dinner"}]
+
+    async def _stream(prompt):
+        for piece in ("Leg day, ", "then salmon."):
+            yield piece
+
+    router.execute_stream_async = _stream
+
+    async def _collect(results):
+        return [piece async for piece in router.synthesize_results_stream(delegations, results)]
+
+    assert asyncio.run(_collect(['{"a": 1}', '{"b": 2}'])) == ["Leg day, ", "then salmon."]
+    assert asyncio.run(_collect(["Do squats.", "Eat salmon."])) == [
+        "**Fitness**: Do squats.\n\n**Nutrition**: Eat salmon."
+    ]
+
+
+def test_identical_results_skip_synthesis() -> None:
+    router = _router()
+    delegations = [{"agent": "fitness", "task": "legs"}, {"agent": "general", "task": "legs"}]
+
+    assert router.synthesize_results(delegations, ['{"a": 1}', '{"a": 1}\n']) == '{"a": 1}'
+    router.execute.assert_not_called()
@@ -97,10 +97,10 @@ def validate_schema():
     logger.info("\n📋 Schema Validation (offline mode)")
 
     # Check that the schema is correctly defined in the module
-    from cv_food_rec.gemini_vision_engine import GeminiVisionEngine
+    from cv_food_rec import gemini_vision_engine
     import inspect
 
-    source = inspect.getsource(GeminiVisionEngine.analyze_food)
+    source = inspect.getsource(gemini_vision_engine)
 
     required_fields = ["visual_warnings", "health_score"]
     missing = []